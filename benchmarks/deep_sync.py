@@ -0,0 +1,47 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from strata.modules.paper.sources.zotero import ZoteroReader, ZoteroStorageManager
+from strata.modules.paper.store import PaperDatabase, PaperFiles, PaperRepository
+from strata.modules.paper.sync import ZoteroSync
+from zotero_library import build_library
+
+
+def timed_store(root: Path, reader: ZoteroReader, storage: ZoteroStorageManager, name: str, run) -> tuple[float, int]:
+    db = PaperDatabase(root / f"{name}.sqlite")
+    db.initialize(files_dir=str(root / f"{name}-files"))
+    syncer = ZoteroSync(reader, storage, db, PaperFiles(root / f"{name}-files"))
+    start = time.perf_counter()
+    run(syncer)
+    seconds = time.perf_counter() - start
+    papers = PaperRepository(db).get_stats()["total"]
+    syncer.close()
+    return seconds, papers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time deep_sync bulk loading against row-by-row sync.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--pdfs", action="store_true", help="attach a small PDF to most items")
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'mode':<6} {'seconds':>8} {'papers':>8} {'items/s':>8}")
+    for items in args.items:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            build_library(root / "zotero.sqlite", items, root / "storage" if args.pdfs else None)
+            reader = ZoteroReader(root / "zotero.sqlite")
+            storage = ZoteroStorageManager(root / "storage")
+            modes = {
+                "sync": lambda syncer: syncer.sync(full=True),
+                "deep": lambda syncer: syncer.deep_sync(),
+            }
+            for mode, run in modes.items():
+                seconds, papers = timed_store(root, reader, storage, mode, run)
+                print(f"{items:>8} {mode:<6} {seconds:>8.2f} {papers:>8} {items / seconds:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
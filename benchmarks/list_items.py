@@ -0,0 +1,61 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from strata.modules.paper.sources.zotero import ZoteroReader
+from zotero_library import build_library
+
+
+class CountingReader(ZoteroReader):
+    queries = 0
+
+    def _connect(self):
+        conn = super()._connect()
+        conn.set_trace_callback(self._count)
+        return conn
+
+    def _count(self, statement: str):
+        self.queries += 1
+
+    def list_items_per_item(self) -> list:
+        with self._connect() as conn:
+            collection_paths = self._collection_paths(conn)
+            return [
+                self._build_item(conn, item_id, key, item_type, collection_paths)
+                for item_id, key, item_type in list(self._iter_items(conn))
+            ]
+
+
+def measure(reader: CountingReader, run, repeat: int) -> tuple[float, int, list]:
+    best = float("inf")
+    for _ in range(repeat):
+        reader.queries = 0
+        start = time.perf_counter()
+        items = run()
+        best = min(best, time.perf_counter() - start)
+    return best, reader.queries, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time list_items with per-item relation queries against bulk loading.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'mode':<6} {'seconds':>8} {'queries':>8} {'items/s':>8}")
+    for items in args.items:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            build_library(root / "zotero.sqlite", items)
+            reader = CountingReader(root / "zotero.sqlite")
+            modes = {"item": reader.list_items_per_item, "bulk": reader.list_items}
+            results = {}
+            for mode, run in modes.items():
+                seconds, queries, results[mode] = measure(reader, run, args.repeat)
+                print(f"{items:>8} {mode:<6} {seconds:>8.2f} {queries:>8} {len(results[mode]) / seconds:>8.0f}")
+            assert results["item"] == results["bulk"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from strata.modules.paper.sources.zotero import ZoteroReader, ZoteroStorageManager
+from strata.modules.paper.store import PaperDatabase, PaperFiles, PaperRepository
+from strata.modules.paper.sync import ZoteroSync
+from zotero_library import build_library
+
+
+def timed_syncs(root: Path, reader: ZoteroReader, name: str, batch_size: int, atomic: bool) -> tuple[float, float, int]:
+    db = PaperDatabase(root / f"{name}.sqlite")
+    db.initialize(files_dir=str(root / f"{name}-files"))
+    syncer = ZoteroSync(
+        reader, ZoteroStorageManager(root / "storage"), db, PaperFiles(root / f"{name}-files"),
+        batch_size=batch_size, atomic=atomic,
+    )
+    seconds = []
+    for _ in range(2):
+        start = time.perf_counter()
+        syncer.sync(full=True)
+        seconds.append(time.perf_counter() - start)
+    papers = PaperRepository(db).get_stats()["total"]
+    syncer.close()
+    return seconds[0], seconds[1], papers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a first sync and a full resync at different commit batch sizes.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 500])
+    parser.add_argument("--atomic", action="store_true", help="also time one transaction for the whole run")
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'mode':<10} {'first s':>8} {'resync s':>9} {'papers':>8}")
+    for items in args.items:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            build_library(root / "zotero.sqlite", items)
+            reader = ZoteroReader(root / "zotero.sqlite")
+            modes = {f"batch={size}": (size, False) for size in args.batch_sizes}
+            if args.atomic:
+                modes["atomic"] = (max(args.batch_sizes), True)
+            for mode, (batch_size, atomic) in modes.items():
+                first, resync, papers = timed_syncs(root, reader, mode.replace("=", "-"), batch_size, atomic)
+                print(f"{items:>8} {mode:<10} {first:>8.2f} {resync:>9.2f} {papers:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from strata.modules.paper.sources.zotero import ZoteroReader, ZoteroStorageManager
+from strata.modules.paper.store import PaperDatabase, PaperFiles
+from strata.modules.paper.sync import ZoteroSync
+from zotero_library import build_library
+
+
+def measure(run) -> tuple[float, float]:
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start, tracemalloc.get_traced_memory()[1] / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak Python memory of reading and syncing a synthetic Zotero library.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'mode':<6} {'seconds':>8} {'peak MiB':>9}")
+    for items in args.items:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            build_library(root / "zotero.sqlite", items)
+            reader = ZoteroReader(root / "zotero.sqlite")
+            db = PaperDatabase(root / "paper.sqlite")
+            db.initialize(files_dir=str(root / "files"))
+            syncer = ZoteroSync(
+                reader, ZoteroStorageManager(root / "storage"), db, PaperFiles(root / "files"),
+                batch_size=args.batch_size,
+            )
+            modes = {
+                "list": lambda: sorted(reader.list_items(), key=lambda item: item.key),
+                "iter": lambda: sum(1 for _ in reader.iter_items(args.batch_size)),
+                "sync": lambda: syncer.sync(full=True),
+            }
+            tracemalloc.start()
+            for mode, run in modes.items():
+                seconds, peak = measure(run)
+                print(f"{items:>8} {mode:<6} {seconds:>8.2f} {peak:>9.1f}")
+            tracemalloc.stop()
+            syncer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import random
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+    CREATE TABLE itemTypes (itemTypeID INTEGER PRIMARY KEY, typeName TEXT);
+    CREATE TABLE items (
+        itemID INTEGER PRIMARY KEY, itemTypeID INT, dateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+        dateModified TEXT DEFAULT CURRENT_TIMESTAMP, clientDateModified TEXT DEFAULT CURRENT_TIMESTAMP,
+        libraryID INT DEFAULT 1, key TEXT NOT NULL, version INT NOT NULL DEFAULT 0, synced INT DEFAULT 0,
+        UNIQUE (libraryID, key)
+    );
+    CREATE TABLE fields (fieldID INTEGER PRIMARY KEY, fieldName TEXT);
+    CREATE TABLE itemDataValues (valueID INTEGER PRIMARY KEY, value UNIQUE);
+    CREATE TABLE itemData (itemID INT, fieldID INT, valueID INT, PRIMARY KEY (itemID, fieldID));
+    CREATE TABLE creators (creatorID INTEGER PRIMARY KEY, firstName TEXT, lastName TEXT, fieldMode INT);
+    CREATE TABLE creatorTypes (creatorTypeID INTEGER PRIMARY KEY, creatorType TEXT);
+    CREATE TABLE itemCreators (
+        itemID INT, creatorID INT, creatorTypeID INT, orderIndex INT,
+        PRIMARY KEY (itemID, creatorID, creatorTypeID, orderIndex)
+    );
+    CREATE TABLE itemAttachments (itemID INTEGER PRIMARY KEY, parentItemID INT, linkMode INT, contentType TEXT, path TEXT);
+    CREATE TABLE collections (
+        collectionID INTEGER PRIMARY KEY, collectionName TEXT, parentCollectionID INT,
+        clientDateModified TEXT DEFAULT CURRENT_TIMESTAMP, key TEXT
+    );
+    CREATE TABLE collectionItems (collectionID INT, itemID INT, orderIndex INT DEFAULT 0, PRIMARY KEY (collectionID, itemID));
+    CREATE TABLE tags (tagID INTEGER PRIMARY KEY, name TEXT UNIQUE);
+    CREATE TABLE itemTags (itemID INT, tagID INT, type INT, PRIMARY KEY (itemID, tagID));
+    CREATE TABLE deletedItems (itemID INTEGER PRIMARY KEY, dateDeleted TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE INDEX collectionItems_itemID ON collectionItems (itemID);
+    CREATE INDEX itemTags_tagID ON itemTags (tagID);
+    CREATE INDEX itemAttachments_parentItemID ON itemAttachments (parentItemID);
+    CREATE INDEX itemCreators_creatorTypeID ON itemCreators (creatorTypeID);
+"""
+ITEM_TYPES = ("journalArticle", "conferencePaper", "preprint", "attachment", "note", "book")
+FIELDS = ("title", "date", "publicationTitle", "DOI", "url", "abstractNote", "volume", "pages")
+VENUES = ("NeurIPS", "ICML", "Nature", "arXiv preprint")
+WORDS = (
+    "deep learning neural network graph attention transformer model vision language "
+    "robot policy reinforcement diffusion generative retrieval"
+).split()
+SURNAMES = ("Smith", "Li", "Wang", "Müller", "García", "Zhang", "Brown", "Kim", "Nguyen", "Ló")
+
+
+def build_library(db_path: Path | str, items: int, storage_dir: Path | str | None = None, seed: int = 0,
+                  pdf_size: int = 2048):
+    rnd = random.Random(seed)
+    db_path = Path(db_path)
+    db_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO itemTypes VALUES (?, ?)", enumerate(ITEM_TYPES, 1))
+    conn.executemany("INSERT INTO fields VALUES (?, ?)", enumerate(FIELDS, 1))
+    conn.execute("INSERT INTO creatorTypes VALUES (1, 'author'), (2, 'editor')")
+    conn.execute(
+        """INSERT INTO collections (collectionID, collectionName, parentCollectionID, key) VALUES
+           (1, 'ML', NULL, 'C1'), (2, 'Vision', 1, 'C2'), (3, 'Deep', 2, 'C3'), (4, 'Robotics', NULL, 'C4')"""
+    )
+    conn.executemany("INSERT INTO tags VALUES (?, ?)", [(t, f"tag{t}") for t in range(1, 21)])
+
+    values: dict[str, int] = {}
+
+    def value_id(value: str) -> int:
+        if value not in values:
+            values[value] = len(values) + 1
+            conn.execute("INSERT INTO itemDataValues VALUES (?, ?)", (values[value], value))
+        return values[value]
+
+    creator_id = 0
+    attachment_id = items + 1
+    for item_id in range(1, items + 1):
+        conn.execute(
+            "INSERT INTO items (itemID, itemTypeID, key, version) VALUES (?, ?, ?, ?)",
+            (item_id, rnd.choice((1, 2, 3, 6)), f"K{item_id:07d}", item_id),
+        )
+        title = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 8))).capitalize()
+        data = {1: title, 2: str(rnd.randint(1995, 2025)), 3: rnd.choice(VENUES), 6: f"abstract {title}"}
+        if rnd.random() < 0.5:
+            data[4] = f"10.1000/x{item_id}"
+        if rnd.random() < 0.3:
+            data[5] = f"https://arxiv.org/abs/2{item_id % 10}01.{item_id:05d}"
+        conn.executemany(
+            "INSERT INTO itemData VALUES (?, ?, ?)",
+            [(item_id, field, value_id(value)) for field, value in data.items()],
+        )
+        for order in range(rnd.randint(1, 4)):
+            creator_id += 1
+            conn.execute(
+                "INSERT INTO creators VALUES (?, ?, ?, 0)", (creator_id, f"Fn{creator_id % 97}", rnd.choice(SURNAMES))
+            )
+            conn.execute(
+                "INSERT INTO itemCreators VALUES (?, ?, ?, ?)", (item_id, creator_id, 1 if order < 3 else 2, order)
+            )
+        for tag in rnd.sample(range(1, 21), rnd.randint(0, 3)):
+            conn.execute("INSERT INTO itemTags VALUES (?, ?, 0)", (item_id, tag))
+        for collection in rnd.sample(range(1, 5), rnd.randint(0, 2)):
+            conn.execute("INSERT INTO collectionItems (collectionID, itemID) VALUES (?, ?)", (collection, item_id))
+        if storage_dir is not None and rnd.random() < 0.8:
+            attachment_key = f"A{item_id:07d}"
+            conn.execute(
+                "INSERT INTO items (itemID, itemTypeID, key, version) VALUES (?, 4, ?, ?)",
+                (attachment_id, attachment_key, item_id),
+            )
+            conn.execute(
+                "INSERT INTO itemAttachments VALUES (?, ?, 0, 'application/pdf', 'storage:paper.pdf')",
+                (attachment_id, item_id),
+            )
+            pdf_dir = Path(storage_dir) / attachment_key
+            pdf_dir.mkdir(parents=True, exist_ok=True)
+            (pdf_dir / "paper.pdf").write_bytes(os.urandom(pdf_size))
+            attachment_id += 1
+    conn.commit()
+    conn.close()
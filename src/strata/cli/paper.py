@@ -6,8 +6,8 @@ import typer
 
 from strata.base.configs import ConfigService
 from strata.modules.paper.sources.zotero import ZoteroReader, ZoteroStorageManager
-from strata.modules.paper.store import PaperDatabase, PaperRepository, PaperFiles
-from strata.modules.paper.sync import ZoteroSync, ZoteroWatcher
+from strata.modules.paper.store import PaperDatabase, PaperRepository, PaperFiles, FileReconciler, NearDuplicateIndex
+from strata.modules.paper.sync import ZoteroSync, ZoteroWatcher, SyncReport, SyncWorker
 from strata.modules.paper.export import BibTeXExporter
 
 app = typer.Typer()
@@ -20,54 +20,89 @@ def get_config() -> ConfigService:
 def get_components(config: ConfigService):
     db_path = config.get("paper.store.database", "~/workspace/resource/paper/paper.sqlite")
     files_dir = config.get("paper.store.files_dir", "~/workspace/resource/paper/files")
+    ingest = config.get("paper.store.ingest", "copy")
+    pragmas = config.get("paper.store.sqlite", {}) or {}
+    readers = config.get("paper.store.readers", 4)
     zotero_db = config.get("paper.sources.zotero.database", "~/workspace/resource/zotero/zotero.sqlite")
     zotero_storage = config.get("paper.sources.zotero.storage_dir", "~/workspace/resource/zotero/storage")
+    zotero_snapshot = config.get("paper.sources.zotero.snapshot", False)
     stop_words = set(config.get("paper.citation.stop_words", []) or [])
+    batch_size = config.get("paper.sync.batch_size", 500)
+    atomic = config.get("paper.sync.atomic", False)
+    pdf_workers = config.get("paper.sync.pdf_workers", 4)
+    dedupe_threshold = config.get("paper.dedupe.threshold", 0.7)
+    auto_merge = config.get("paper.dedupe.auto_merge", False)
 
-    db = PaperDatabase(db_path)
+    db = PaperDatabase(db_path, pragmas, readers)
     db.initialize(files_dir=files_dir)
-    files = PaperFiles(files_dir)
-    reader = ZoteroReader(zotero_db)
+    files = PaperFiles(files_dir, ingest)
+    reader = ZoteroReader(zotero_db, snapshot=zotero_snapshot)
     zotero_stor = ZoteroStorageManager(zotero_storage)
     repo = PaperRepository(db)
-    syncer = ZoteroSync(reader, zotero_stor, db, files, stop_words)
+    syncer = ZoteroSync(
+        reader, zotero_stor, db, files, stop_words, batch_size, atomic, pdf_workers, dedupe_threshold, auto_merge
+    )
 
     return db, files, reader, zotero_stor, repo, syncer
 
 
+def format_report(report: SyncReport) -> str:
+    summary = (
+        f"Synced {report.total} papers: {report.inserted} inserted, {report.updated} updated, "
+        f"{report.unchanged} unchanged, {report.deleted} deleted."
+    )
+    if report.renamed:
+        summary += f"\nRenamed {report.renamed} citation keys."
+    if report.merged:
+        summary += f"\nMerged {report.merged} near-duplicate papers."
+    if report.pdf_copied:
+        summary += (
+            f"\nCopied {report.pdf_copied} PDFs ({report.pdf_bytes / 2**20:.1f} MB, "
+            f"{report.pdf_throughput:.1f} MB/s)."
+        )
+    return summary
+
+
 @app.command()
-def sync(deep: bool = typer.Option(False, "--deep", "-d", help="Deep sync: clear all and rebuild")):
+def sync(
+    deep: bool = typer.Option(False, "--deep", "-d", help="Deep sync: rebuild the library in a shadow copy and swap it in"),
+    full: bool = typer.Option(False, "--full", "-f", help="Re-read the whole Zotero library instead of changes only"),
+):
     """Sync papers from Zotero to local store."""
     config = get_config()
     db, files, reader, zotero_stor, repo, syncer = get_components(config)
 
     if deep:
         typer.echo("Deep syncing (clearing and rebuilding)...")
-        papers = syncer.deep_sync()
-        typer.echo(f"Rebuilt with {len(papers)} papers.")
+        count = syncer.deep_sync()
+        typer.echo(f"Rebuilt with {count} papers.")
     else:
         typer.echo("Syncing from Zotero...")
-        papers, deleted = syncer.sync()
-        typer.echo(f"Synced {len(papers)} papers, deleted {deleted}.")
+        report = syncer.sync(full=full)
+        typer.echo(format_report(report))
 
 
 @app.command()
 def watch():
     """Watch Zotero for changes and sync automatically."""
     config = get_config()
-    db, files, reader, zotero_stor, repo, syncer = get_components(config)
     zotero_db = config.get("paper.sources.zotero.database")
-
-    typer.echo("Initial sync...")
-    papers, deleted = syncer.sync()
-    typer.echo(f"Synced {len(papers)} papers, deleted {deleted}.")
+    polling = config.get("paper.sources.zotero.watch_polling", False)
 
     running = True
 
+    def on_complete(report: SyncReport, seconds: float):
+        typer.echo(format_report(report))
+        typer.echo(f"Sync took {seconds:.2f}s (queue depth {worker.depth}, {worker.coalesced} coalesced).")
+
+    def on_error(error: Exception):
+        typer.echo(f"Sync failed: {error}", err=True)
+
+    worker = SyncWorker(lambda: get_components(config)[5], on_complete, on_error)
+
     def on_change():
-        typer.echo("Change detected, syncing...")
-        new_papers, del_count = syncer.sync()
-        typer.echo(f"Synced {len(new_papers)} papers, deleted {del_count}.")
+        typer.echo(f"Change detected, queueing sync (queue depth {worker.depth})...")
+        worker.request()
 
     def stop_handler(signum, frame):
         nonlocal running
@@ -77,15 +112,22 @@ def watch():
     signal.signal(signal.SIGINT, stop_handler)
     signal.signal(signal.SIGTERM, stop_handler)
 
-    watcher = ZoteroWatcher(zotero_db, on_change)
+    typer.echo("Initial sync...")
+    worker.start()
+    worker.request()
+
+    watcher = ZoteroWatcher(zotero_db, on_change, fingerprint=ZoteroReader(zotero_db).fingerprint, polling=polling)
     watcher.start()
     typer.echo(f"Watching {zotero_db} for changes... (Ctrl+C to stop)")
 
-    while running:
+    while running and worker.is_running():
         time.sleep(1)
 
     watcher.stop()
-    db.close()
+    worker.stop()
+    if running:
+        typer.echo("Sync worker exited, stopping watch.", err=True)
+        raise typer.Exit(1)
     typer.echo("Stopped.")
 
 
@@ -206,38 +248,100 @@ def collections():
 
 
 @app.command()
-def check():
+def check(
+    fix: bool = typer.Option(False, "--fix", help="Delete orphan folders and correct pdf_path records"),
+):
     """Validate PDF/DB consistency and report anomalies."""
     config = get_config()
     db, files, reader, zotero_stor, repo, syncer = get_components(config)
 
-    all_papers = repo.list_all()
-    db_keys = {p.citation_key for p in all_papers}
-    folder_keys = set(files.list_folders())
-
-    orphan_folders = folder_keys - db_keys
-    missing_pdfs = []
-    no_pdf = []
-    for p in all_papers:
-        if p.pdf_path:
-            if not files.exists(p.citation_key):
-                missing_pdfs.append(p.citation_key)
-        else:
-            no_pdf.append(p.citation_key)
-
-    typer.echo(f"Total papers: {len(all_papers)}")
-    typer.echo(f"PDF folders: {len(folder_keys)}")
-    typer.echo(f"Papers without PDF: {len(no_pdf)}")
-
-    if orphan_folders:
-        typer.echo(f"\nOrphan folders ({len(orphan_folders)}):")
-        for f in sorted(orphan_folders):
+    reconciler = FileReconciler(repo, files)
+    report = reconciler.scan()
+
+    typer.echo(f"Total papers: {report.total}")
+    typer.echo(f"PDF folders: {report.folders}")
+    typer.echo(f"Papers without PDF: {len(report.no_pdf)}")
+
+    if report.orphan_folders:
+        typer.echo(f"\nOrphan folders ({len(report.orphan_folders)}):")
+        for f in report.orphan_folders:
             typer.echo(f"  {f}")
 
-    if missing_pdfs:
-        typer.echo(f"\nMissing PDFs ({len(missing_pdfs)}):")
-        for k in sorted(missing_pdfs):
+    if report.missing_pdfs:
+        typer.echo(f"\nMissing PDFs ({len(report.missing_pdfs)}):")
+        for k in report.missing_pdfs:
             typer.echo(f"  {k}")
 
-    if not orphan_folders and not missing_pdfs:
+    if report.stale_paths:
+        typer.echo(f"\nStale pdf_path records ({len(report.stale_paths)}):")
+        for k, _ in report.stale_paths:
+            typer.echo(f"  {k}")
+
+    if not report.has_anomalies:
         typer.echo("\nNo anomalies found.")
+    elif fix:
+        with db.lock():
+            reconciler.apply(reconciler.scan())
+        typer.echo("\nFixed.")
+
+
+@app.command()
+def dedupe(
+    threshold: float = typer.Option(None, "--threshold", "-t", help="Minimum estimated similarity (0-1)"),
+    merge: bool = typer.Option(False, "--merge", help="Merge each pair into the better-documented paper"),
+):
+    """Report near-duplicate papers."""
+    config = get_config()
+    db, files, reader, zotero_stor, repo, syncer = get_components(config)
+    threshold = threshold or config.get("paper.dedupe.threshold", 0.7)
+
+    index = NearDuplicateIndex(db)
+    index.refresh()
+    repo.commit()
+    pairs = index.find_pairs(threshold)
+    if not pairs:
+        typer.echo("No near-duplicates found.")
+        return
+
+    typer.echo(f"Near-duplicates ({len(pairs)}):")
+    for left, right, score in pairs:
+        typer.echo(f"\n  {score:.2f}  {left} <-> {right}")
+        for key in (left, right):
+            paper = repo.get(key)
+            typer.echo(f"    [{key}] ({paper.year or '?'}) {paper.title}")
+
+    if merge:
+        merged = syncer.merge_duplicates(pairs)
+        repo.commit()
+        typer.echo(f"\nMerged {merged} papers.")
+
+
+@app.command()
+def rekey():
+    """Re-plan citation keys for the whole library."""
+    db, files, reader, zotero_stor, repo, syncer = get_components(get_config())
+    renamed = syncer.rekey()
+    if not renamed:
+        typer.echo("All citation keys are up to date.")
+        return
+    for old_key, new_key in sorted(renamed.items()):
+        typer.echo(f"  {old_key} -> {new_key}")
+    typer.echo(f"Renamed {len(renamed)} citation keys.")
+
+
+@app.command()
+def maintenance(
+    check_only: bool = typer.Option(False, "--check", help="Only verify the search index"),
+):
+    """Verify and rebuild the full-text search index."""
+    config = get_config()
+    db, files, reader, zotero_stor, repo, syncer = get_components(config)
+
+    healthy = repo.check_fts()
+    typer.echo(f"Search index: {'ok' if healthy else 'inconsistent'}")
+    if check_only:
+        return
+
+    start = time.perf_counter()
+    repo.rebuild_fts()
+    typer.echo(f"Rebuilt search index in {time.perf_counter() - start:.2f}s.")
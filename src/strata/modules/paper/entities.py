@@ -1,6 +1,12 @@
+import hashlib
 import json
 from pydantic import BaseModel, Field, computed_field
 
+FINGERPRINT_FIELDS = {
+    "item_type", "title", "authors", "year", "journal", "volume", "issue", "pages",
+    "doi", "url", "abstract", "publisher", "book_title", "arxiv_id", "venue",
+}
+
 
 class Author(BaseModel):
     first_name: str = ""
@@ -32,6 +38,7 @@ class Paper(BaseModel):
     imported_at: str | None = None
     synced_at: str | None = None
     deleted_at: str | None = None
+    content_hash: str | None = None
 
     @computed_field
     @property
@@ -44,6 +51,12 @@ class Paper(BaseModel):
     def editors(self) -> list[Author]:
         return [a for a in self.authors if a.role == "editor"]
 
+    def content_fingerprint(self) -> str:
+        content = self.model_dump(include=FINGERPRINT_FIELDS)
+        content["source_tags"] = sorted(self.source_tags)
+        content["source_collections"] = sorted(self.source_collections)
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
     def authors_json(self) -> str:
         return json.dumps([a.model_dump() for a in self.authors])
 
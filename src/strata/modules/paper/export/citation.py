@@ -42,30 +42,35 @@ class CitationKeyManager:
         words = _normalize(title).split()
         return [w for w in words if w not in self._stop_words] or words
 
-    def generate_unique(self, item: ZoteroItem, existing_keys: set[str]) -> str:
+    def _key_parts(self, item: ZoteroItem) -> tuple[str, list[str]]:
         author = _format_author(item)
         year = str(item.year) if item.year else ""
         title_words = self._title_words(item.title) if item.title else []
+        return f"{author}{year}", title_words
 
+    def _candidates(self, prefix: str, title_words: list[str]):
         for count in range(1, len(title_words) + 1):
-            key = f"{author}{year}{''.join(title_words[:count])}"
-            if key not in existing_keys:
-                return key
+            yield f"{prefix}{''.join(title_words[:count])}"
 
-        base_key = f"{author}{year}{''.join(title_words)}" if title_words else f"{author}{year}"
-        if base_key not in existing_keys:
-            return base_key
+        base_key = f"{prefix}{''.join(title_words)}"
+        yield base_key
 
         for i in range(2, 100):
-            key = f"{base_key}-{i}"
+            yield f"{base_key}-{i}"
+
+    def matches(self, item: ZoteroItem, citation_key: str) -> bool:
+        return citation_key in self._candidates(*self._key_parts(item))
+
+    def generate_unique(self, item: ZoteroItem, existing_keys: set[str]) -> str:
+        prefix, title_words = self._key_parts(item)
+        for key in self._candidates(prefix, title_words):
             if key not in existing_keys:
                 return key
+        return f"{prefix}{''.join(title_words)}"
 
-        return base_key
-
-    def generate_all(self, items: list[ZoteroItem]) -> dict[str, str]:
+    def generate_all(self, items: list[ZoteroItem], reserved: set[str] = frozenset()) -> dict[str, str]:
         items = sorted(items, key=lambda i: i.key)
-        existing: set[str] = set()
+        existing: set[str] = set(reserved)
         result: dict[str, str] = {}
         for item in items:
             key = self.generate_unique(item, existing)
@@ -1,74 +1,132 @@
 import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 from typing import Iterator
 
 from ...models import ZoteroItem, Creator, Attachment
 
+BULK_CHUNK_SIZE = 500
+SNAPSHOT_TIMEOUT = 5.0
+FINGERPRINT_SQL = """
+    SELECT
+        (SELECT MAX(clientDateModified) FROM items),
+        (SELECT MAX(clientDateModified) FROM collections),
+        (SELECT COUNT(*) FROM items),
+        (SELECT COUNT(*) FROM deletedItems),
+        (SELECT COUNT(*) FROM collectionItems),
+        (SELECT COUNT(*) FROM itemTags)
+"""
+
 
 class ZoteroReader:
-    def __init__(self, db_path: Path | str):
+    def __init__(self, db_path: Path | str, snapshot: bool = False):
         self._db_path = Path(db_path).expanduser()
         if not self._db_path.exists():
             raise FileNotFoundError(f"Database not found: {self._db_path}")
+        self._snapshot = snapshot
+        self._snapshot_conn: sqlite3.Connection | None = None
+        self._collection_cache: tuple[tuple[int, int], dict[int, str]] | None = None
 
     def _connect(self) -> sqlite3.Connection:
+        if self._snapshot_conn is not None:
+            return self._snapshot_conn
         uri = f"file:{self._db_path}?immutable=1"
         conn = sqlite3.connect(uri, uri=True)
         conn.row_factory = sqlite3.Row
         return conn
 
-    def _get_item_fields(self, conn: sqlite3.Connection, item_id: int) -> dict[str, str]:
+    def _copy_to(self, target: sqlite3.Connection):
+        source = sqlite3.connect(f"file:{self._db_path}?mode=ro", uri=True, timeout=SNAPSHOT_TIMEOUT)
+        try:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target)
+        except sqlite3.OperationalError:
+            source.close()
+            source = sqlite3.connect(f"file:{self._db_path}?immutable=1", uri=True)
+            source.backup(target)
+        finally:
+            source.close()
+
+    @contextmanager
+    def session(self) -> Iterator["ZoteroReader"]:
+        if not self._snapshot or self._snapshot_conn is not None:
+            yield self
+            return
+        snapshot = sqlite3.connect(":memory:")
+        try:
+            self._copy_to(snapshot)
+            snapshot.row_factory = sqlite3.Row
+            self._snapshot_conn = snapshot
+            self._collection_cache = None
+            yield self
+        finally:
+            self._snapshot_conn = None
+            self._collection_cache = None
+            snapshot.close()
+
+    def _placeholders(self, values: list) -> str:
+        return ",".join("?" * len(values))
+
+    def _get_item_fields(self, conn: sqlite3.Connection, item_ids: list[int]) -> dict[int, dict[str, str]]:
         cursor = conn.execute(
-            """
-            SELECT f.fieldName, iv.value
+            f"""
+            SELECT id.itemID, f.fieldName, iv.value
             FROM itemDataValues iv
             JOIN itemData id ON iv.valueID = id.valueID
             JOIN fields f ON id.fieldID = f.fieldID
-            WHERE id.itemID = ?
+            WHERE id.itemID IN ({self._placeholders(item_ids)})
             """,
-            (item_id,),
+            item_ids,
         )
-        return {row["fieldName"]: row["value"] for row in cursor}
+        fields: dict[int, dict[str, str]] = defaultdict(dict)
+        for row in cursor:
+            fields[row["itemID"]][row["fieldName"]] = row["value"]
+        return fields
 
-    def _get_creators(self, conn: sqlite3.Connection, item_id: int) -> list[Creator]:
+    def _get_creators(self, conn: sqlite3.Connection, item_ids: list[int]) -> dict[int, list[Creator]]:
         cursor = conn.execute(
-            """
-            SELECT c.firstName, c.lastName, ct.creatorType
+            f"""
+            SELECT ic.itemID, c.firstName, c.lastName, ct.creatorType
             FROM creators c
             JOIN itemCreators ic ON c.creatorID = ic.creatorID
             JOIN creatorTypes ct ON ic.creatorTypeID = ct.creatorTypeID
-            WHERE ic.itemID = ?
-            ORDER BY ic.orderIndex
+            WHERE ic.itemID IN ({self._placeholders(item_ids)})
+            ORDER BY ic.itemID, ic.orderIndex
             """,
-            (item_id,),
+            item_ids,
         )
-        return [
-            Creator(
-                first_name=row["firstName"] or "",
-                last_name=row["lastName"] or "",
-                role=row["creatorType"],
+        creators: dict[int, list[Creator]] = defaultdict(list)
+        for row in cursor:
+            creators[row["itemID"]].append(
+                Creator(
+                    first_name=row["firstName"] or "",
+                    last_name=row["lastName"] or "",
+                    role=row["creatorType"],
+                )
             )
-            for row in cursor
-        ]
+        return creators
 
-    def _get_attachments(self, conn: sqlite3.Connection, item_id: int) -> list[Attachment]:
+    def _get_attachments(self, conn: sqlite3.Connection, item_ids: list[int]) -> dict[int, list[Attachment]]:
         cursor = conn.execute(
-            """
-            SELECT ia.path, ia.contentType, i.key
+            f"""
+            SELECT ia.parentItemID, ia.path, ia.contentType, i.key
             FROM itemAttachments ia
             JOIN items i ON ia.itemID = i.itemID
-            WHERE ia.parentItemID = ?
+            WHERE ia.parentItemID IN ({self._placeholders(item_ids)})
             """,
-            (item_id,),
+            item_ids,
         )
-        attachments = []
+        attachments: dict[int, list[Attachment]] = defaultdict(list)
         for row in cursor:
             path = row["path"] or ""
             if path.startswith("storage:"):
                 path = path[8:]
             elif path.startswith("attachments:"):
                 path = path[12:]
-            attachments.append(
+            attachments[row["parentItemID"]].append(
                 Attachment(
                     path=path,
                     content_type=row["contentType"] or "",
@@ -83,68 +141,114 @@ class ZoteroReader:
         for row in cursor:
             collections[row["collectionID"]] = (row["collectionName"], row["parentCollectionID"])
 
-        def get_path(coll_id: int) -> str:
-            name, parent_id = collections[coll_id]
-            if parent_id is None:
-                return name
-            return f"{get_path(parent_id)}/{name}"
+        paths: dict[int, str] = {}
+        for coll_id in collections:
+            chain: list[int] = []
+            seen: set[int] = set()
+            current = coll_id
+            while current in collections and current not in paths and current not in seen:
+                chain.append(current)
+                seen.add(current)
+                current = collections[current][1]
+            prefix = paths.get(current)
+            for chain_id in reversed(chain):
+                name = collections[chain_id][0]
+                prefix = name if prefix is None else f"{prefix}/{name}"
+                paths[chain_id] = prefix
+        return paths
 
-        return {coll_id: get_path(coll_id) for coll_id in collections}
+    def _db_stamp(self) -> tuple[int, int]:
+        stat = self._db_path.stat()
+        return stat.st_mtime_ns, stat.st_size
 
-    def _get_collections(self, conn: sqlite3.Connection, item_id: int, collection_paths: dict[int, str]) -> list[str]:
+    def _collection_paths(self, conn: sqlite3.Connection) -> dict[int, str]:
+        stamp = self._db_stamp()
+        if self._collection_cache is None or self._collection_cache[0] != stamp:
+            self._collection_cache = (stamp, self._build_collection_paths(conn))
+        return self._collection_cache[1]
+
+    def _get_collections(
+        self, conn: sqlite3.Connection, item_ids: list[int], collection_paths: dict[int, str]
+    ) -> dict[int, list[str]]:
         cursor = conn.execute(
-            """
-            SELECT c.collectionID
+            f"""
+            SELECT ci.itemID, c.collectionID
             FROM collections c
             JOIN collectionItems ci ON c.collectionID = ci.collectionID
-            WHERE ci.itemID = ?
+            WHERE ci.itemID IN ({self._placeholders(item_ids)})
             """,
-            (item_id,),
+            item_ids,
         )
-        return [collection_paths[row["collectionID"]] for row in cursor if row["collectionID"] in collection_paths]
+        collections: dict[int, list[str]] = defaultdict(list)
+        for row in cursor:
+            if row["collectionID"] in collection_paths:
+                collections[row["itemID"]].append(collection_paths[row["collectionID"]])
+        return collections
 
-    def _get_tags(self, conn: sqlite3.Connection, item_id: int) -> list[str]:
+    def _get_tags(self, conn: sqlite3.Connection, item_ids: list[int]) -> dict[int, list[str]]:
         cursor = conn.execute(
-            """
-            SELECT t.name
+            f"""
+            SELECT it.itemID, t.name
             FROM tags t
             JOIN itemTags it ON t.tagID = it.tagID
-            WHERE it.itemID = ?
+            WHERE it.itemID IN ({self._placeholders(item_ids)})
             """,
-            (item_id,),
+            item_ids,
         )
-        return [row["name"] for row in cursor]
+        tags: dict[int, list[str]] = defaultdict(list)
+        for row in cursor:
+            tags[row["itemID"]].append(row["name"])
+        return tags
+
+    def _build_items(
+        self, conn: sqlite3.Connection, rows: list[tuple[int, str, str]], collection_paths: dict[int, str]
+    ) -> list[ZoteroItem]:
+        items = []
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+            chunk = rows[start:start + BULK_CHUNK_SIZE]
+            item_ids = [item_id for item_id, _, _ in chunk]
+            fields = self._get_item_fields(conn, item_ids)
+            creators = self._get_creators(conn, item_ids)
+            attachments = self._get_attachments(conn, item_ids)
+            collections = self._get_collections(conn, item_ids, collection_paths)
+            tags = self._get_tags(conn, item_ids)
+            for item_id, key, item_type in chunk:
+                item_fields = fields.get(item_id, {})
+                items.append(
+                    ZoteroItem(
+                        item_id=item_id,
+                        key=key,
+                        item_type=item_type,
+                        title=item_fields.get("title", ""),
+                        date=item_fields.get("date"),
+                        journal=item_fields.get("publicationTitle"),
+                        volume=item_fields.get("volume"),
+                        issue=item_fields.get("issue"),
+                        pages=item_fields.get("pages"),
+                        doi=item_fields.get("DOI"),
+                        url=item_fields.get("url"),
+                        abstract=item_fields.get("abstractNote"),
+                        publisher=item_fields.get("publisher"),
+                        book_title=item_fields.get("bookTitle"),
+                        creators=creators.get(item_id, []),
+                        attachments=attachments.get(item_id, []),
+                        collections=collections.get(item_id, []),
+                        tags=tags.get(item_id, []),
+                    )
+                )
+        return items
 
     def _build_item(
         self, conn: sqlite3.Connection, item_id: int, key: str, item_type: str, collection_paths: dict[int, str]
     ) -> ZoteroItem:
-        fields = self._get_item_fields(conn, item_id)
-        return ZoteroItem(
-            item_id=item_id,
-            key=key,
-            item_type=item_type,
-            title=fields.get("title", ""),
-            date=fields.get("date"),
-            journal=fields.get("publicationTitle"),
-            volume=fields.get("volume"),
-            issue=fields.get("issue"),
-            pages=fields.get("pages"),
-            doi=fields.get("DOI"),
-            url=fields.get("url"),
-            abstract=fields.get("abstractNote"),
-            publisher=fields.get("publisher"),
-            book_title=fields.get("bookTitle"),
-            creators=self._get_creators(conn, item_id),
-            attachments=self._get_attachments(conn, item_id),
-            collections=self._get_collections(conn, item_id, collection_paths),
-            tags=self._get_tags(conn, item_id),
-        )
+        return self._build_items(conn, [(item_id, key, item_type)], collection_paths)[0]
 
     def _iter_items(
         self,
         conn: sqlite3.Connection,
         collection: str | None = None,
         tag: str | None = None,
+        modified_since: str | None = None,
     ) -> Iterator[tuple[int, str, str]]:
         base_query = """
             SELECT DISTINCT i.itemID, i.key, it.typeName
@@ -171,7 +275,33 @@ class ZoteroReader:
             conditions.append("t.name = ?")
             params.append(tag)
 
-        query = base_query + " WHERE " + " AND ".join(conditions)
+        if modified_since:
+            base_query = """
+                WITH RECURSIVE changed_collections(collectionID) AS (
+                    SELECT collectionID FROM collections WHERE clientDateModified >= ?
+                    UNION
+                    SELECT cc.collectionID
+                    FROM collections cc
+                    JOIN changed_collections ch ON cc.parentCollectionID = ch.collectionID
+                )
+            """ + base_query
+            conditions.append("""(
+                i.clientDateModified >= ?
+                OR i.itemID IN (
+                    SELECT ia.parentItemID
+                    FROM itemAttachments ia
+                    JOIN items a ON ia.itemID = a.itemID
+                    WHERE a.clientDateModified >= ?
+                )
+                OR i.itemID IN (
+                    SELECT cm.itemID
+                    FROM collectionItems cm
+                    JOIN changed_collections ch ON cm.collectionID = ch.collectionID
+                )
+            )""")
+            params = [modified_since] + params + [modified_since, modified_since]
+
+        query = base_query + " WHERE " + " AND ".join(conditions) + " ORDER BY i.key"
         cursor = conn.execute(query, params)
         for row in cursor:
             yield row["itemID"], row["key"], row["typeName"]
@@ -182,11 +312,46 @@ class ZoteroReader:
         tag: str | None = None,
     ) -> list[ZoteroItem]:
         with self._connect() as conn:
-            collection_paths = self._build_collection_paths(conn)
-            items = []
-            for item_id, key, item_type in self._iter_items(conn, collection, tag):
-                items.append(self._build_item(conn, item_id, key, item_type, collection_paths))
-            return items
+            collection_paths = self._collection_paths(conn)
+            rows = list(self._iter_items(conn, collection, tag))
+            return self._build_items(conn, rows, collection_paths)
+
+    def iter_items(
+        self,
+        batch_size: int = BULK_CHUNK_SIZE,
+        modified_since: str | None = None,
+    ) -> Iterator[ZoteroItem]:
+        with self._connect() as conn:
+            collection_paths = self._collection_paths(conn)
+            rows = self._iter_items(conn, modified_since=modified_since)
+            while batch := list(islice(rows, batch_size)):
+                yield from self._build_items(conn, batch, collection_paths)
+
+    def list_changed_since(self, watermark: str) -> list[ZoteroItem]:
+        return list(self.iter_items(modified_since=watermark))
+
+    def list_keys(self) -> set[str]:
+        with self._connect() as conn:
+            return {key for _, key, _ in self._iter_items(conn)}
+
+    def current_watermark(self) -> str | None:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                SELECT MAX(modified) FROM (
+                    SELECT MAX(clientDateModified) AS modified FROM items
+                    UNION ALL
+                    SELECT MAX(clientDateModified) FROM collections
+                )
+                """
+            )
+            return cursor.fetchone()[0]
+
+    def fingerprint(self, conn: sqlite3.Connection | None = None) -> tuple:
+        if conn is not None:
+            return tuple(conn.execute(FINGERPRINT_SQL).fetchone())
+        with self._connect() as conn:
+            return tuple(conn.execute(FINGERPRINT_SQL).fetchone())
 
     def get_item(self, item_id: int) -> ZoteroItem | None:
         with self._connect() as conn:
@@ -203,7 +368,7 @@ class ZoteroReader:
             row = cursor.fetchone()
             if not row:
                 return None
-            collection_paths = self._build_collection_paths(conn)
+            collection_paths = self._collection_paths(conn)
             return self._build_item(conn, item_id, row["key"], row["typeName"], collection_paths)
 
     def get_item_by_key(self, key: str) -> ZoteroItem | None:
@@ -221,13 +386,13 @@ class ZoteroReader:
             row = cursor.fetchone()
             if not row:
                 return None
-            collection_paths = self._build_collection_paths(conn)
+            collection_paths = self._collection_paths(conn)
             return self._build_item(conn, row["itemID"], key, row["typeName"], collection_paths)
 
     def search(self, query: str) -> list[ZoteroItem]:
         pattern = f"%{query}%"
         with self._connect() as conn:
-            collection_paths = self._build_collection_paths(conn)
+            collection_paths = self._collection_paths(conn)
             cursor = conn.execute(
                 """
                 SELECT DISTINCT i.itemID, i.key, it.typeName
@@ -249,10 +414,8 @@ class ZoteroReader:
                 """,
                 (pattern, pattern, pattern),
             )
-            items = []
-            for row in cursor:
-                items.append(self._build_item(conn, row["itemID"], row["key"], row["typeName"], collection_paths))
-            return items
+            rows = [(row["itemID"], row["key"], row["typeName"]) for row in cursor]
+            return self._build_items(conn, rows, collection_paths)
 
     def list_collections(self) -> list[str]:
         with self._connect() as conn:
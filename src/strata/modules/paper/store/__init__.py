@@ -1,9 +1,14 @@
 from .database import PaperDatabase
 from .repository import PaperRepository
 from .files import PaperFiles
+from .reconcile import FileReconciler, ReconcileReport
+from .near_duplicates import NearDuplicateIndex
 
 __all__ = [
     "PaperDatabase",
     "PaperRepository",
     "PaperFiles",
+    "FileReconciler",
+    "ReconcileReport",
+    "NearDuplicateIndex",
 ]
@@ -1,20 +1,166 @@
+import queue
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Protocol
+
+SHADOW_SUFFIX = ".shadow"
+LOCK_SUFFIX = ".lock"
+DEFAULT_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+    "busy_timeout": 5000,
+}
+READER_PRAGMAS = ("mmap_size", "cache_size", "busy_timeout")
+
+
+class ConnectionSource(Protocol):
+    def connection(self) -> sqlite3.Connection: ...
+
+
+def _apply_pragmas(conn: sqlite3.Connection, pragmas: dict):
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}").fetchall()
+
+
+class ReaderPool:
+    def __init__(self, db_path: Path, pragmas: dict, size: int):
+        self._db_path = db_path
+        self._pragmas = pragmas
+        self._slots = threading.BoundedSemaphore(max(size, 1))
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"{self._db_path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        _apply_pragmas(conn, self._pragmas)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+        self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class ReaderSession:
+    def __init__(self, pool: ReaderPool):
+        self._pool = pool
+        self._conn: sqlite3.Connection | None = None
+
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._pool.acquire()
+        return self._conn
+
+    def close(self):
+        if self._conn:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def __enter__(self) -> "ReaderSession":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def _lock_file(f):
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+class WriterLock:
+    def __init__(self, path: Path):
+        self._path = path
+        self._mutex = threading.RLock()
+        self._file = None
+        self._depth = 0
+
+    def acquire(self):
+        self._mutex.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self._path, "a")
+                _lock_file(self._file)
+            except BaseException:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                self._mutex.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._file.close()
+            self._file = None
+        self._mutex.release()
+
+    def __enter__(self) -> "WriterLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
 
 
 class PaperDatabase:
-    def __init__(self, db_path: Path | str):
+    def __init__(self, db_path: Path | str, pragmas: dict | None = None, readers: int = 4):
         self._db_path = Path(db_path).expanduser()
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
         self._conn: sqlite3.Connection | None = None
+        self._pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self._readers = readers
+        self._writer = WriterLock(self._db_path.with_name(self._db_path.name + LOCK_SUFFIX))
+        self._pool = ReaderPool(
+            self._db_path, {name: self._pragmas[name] for name in READER_PRAGMAS if name in self._pragmas}, readers
+        )
 
     def _connect(self) -> sqlite3.Connection:
         conn = sqlite3.connect(self._db_path)
         conn.row_factory = sqlite3.Row
+        _apply_pragmas(conn, self._pragmas)
         return conn
 
+    @property
+    def path(self) -> Path:
+        return self._db_path
+
     def initialize(self, files_dir: str | None = None):
-        from . import migration_001  # noqa: F401
+        from . import (  # noqa: F401
+            migration_001, migration_002, migration_003, migration_004,
+            migration_005, migration_006, migration_007, migration_008, migration_009,
+            migration_010, migration_011,
+        )
         from .migrations import run_migrations
         conn = self.connection()
         run_migrations(conn, {"files_dir": files_dir})
@@ -24,7 +170,51 @@ class PaperDatabase:
             self._conn = self._connect()
         return self._conn
 
+    def reader(self) -> ReaderSession:
+        return ReaderSession(self._pool)
+
+    def check(self) -> bool:
+        return self.connection().execute("PRAGMA quick_check").fetchone()[0] == "ok"
+
+    def lock(self) -> WriterLock:
+        return self._writer
+
+    def _shadow(self) -> "PaperDatabase":
+        return PaperDatabase(self._db_path.with_name(self._db_path.name + SHADOW_SUFFIX), self._pragmas, self._readers)
+
+    def shadow(self) -> "PaperDatabase":
+        shadow = self._shadow()
+        shadow.discard()
+        return shadow
+
+    def recover(self, complete: bool) -> bool:
+        shadow = self._shadow()
+        if not shadow.path.exists():
+            shadow.discard()
+            return False
+        if complete:
+            self.replace_with(shadow)
+        else:
+            shadow.discard()
+        return True
+
+    def discard(self):
+        self.close()
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            path = Path(f"{self._db_path}{suffix}")
+            if path.exists():
+                path.unlink()
+
+    def replace_with(self, shadow: "PaperDatabase"):
+        conn = self.connection()
+        conn.commit()
+        source = shadow.connection()
+        source.commit()
+        source.backup(conn)
+        shadow.discard()
+
     def close(self):
+        self._pool.close()
         if self._conn:
             self._conn.close()
             self._conn = None
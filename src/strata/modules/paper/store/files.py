@@ -1,13 +1,56 @@
+import ctypes
+import errno
+import hashlib
 import os
 import shutil
 import tempfile
 from pathlib import Path
 
+INGEST_STRATEGIES = ("copy", "hardlink", "reflink", "symlink")
+SHADOW_SUFFIX = ".shadow"
+RETIRED_SUFFIX = ".old"
+SEAL_NAME = ".sealed"
+FICLONE = 0x40049409
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+RENAME_SWAP = 2
+
+
+def file_hash(path: Path | str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def exchange(left: Path, right: Path) -> bool:
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except (OSError, TypeError):
+        return False
+    if hasattr(libc, "renameat2"):
+        result = libc.renameat2(AT_FDCWD, os.fsencode(left), AT_FDCWD, os.fsencode(right), RENAME_EXCHANGE)
+    elif hasattr(libc, "renamex_np"):
+        result = libc.renamex_np(os.fsencode(left), os.fsencode(right), RENAME_SWAP)
+    else:
+        return False
+    if result == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.EINVAL, errno.ENOSYS, errno.ENOTSUP):
+        return False
+    raise OSError(error, os.strerror(error), str(left), None, str(right))
+
 
 class PaperFiles:
-    def __init__(self, files_dir: Path | str):
+    def __init__(self, files_dir: Path | str, ingest: str = "copy"):
+        if ingest not in INGEST_STRATEGIES:
+            raise ValueError(f"Unknown ingest strategy: {ingest}")
         self._files_dir = Path(files_dir).expanduser()
         self._files_dir.mkdir(parents=True, exist_ok=True)
+        self._ingest = ingest
+
+    @property
+    def files_dir(self) -> Path:
+        return self._files_dir
 
     def _paper_dir(self, citation_key: str) -> Path:
         return self._files_dir / citation_key
@@ -15,9 +58,40 @@ class PaperFiles:
     def get_path(self, citation_key: str) -> Path:
         return self._paper_dir(citation_key) / "paper.pdf"
 
+    def relative_path(self, citation_key: str) -> str:
+        return f"{citation_key}/paper.pdf"
+
     def exists(self, citation_key: str) -> bool:
         return self.get_path(citation_key).exists()
 
+    def _reflink(self, source_path: Path, dest_path: str):
+        try:
+            import fcntl
+        except ImportError:
+            raise OSError("reflink is not supported on this platform")
+        with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source_path, dest_path)
+
+    def _link(self, source_path: Path, dest_path: str):
+        os.unlink(dest_path)
+        if self._ingest == "hardlink":
+            os.link(source_path, dest_path)
+        elif self._ingest == "symlink":
+            os.symlink(source_path.resolve(), dest_path)
+        else:
+            self._reflink(source_path, dest_path)
+
+    def _ingest_file(self, source_path: Path, dest_path: str):
+        if self._ingest != "copy":
+            try:
+                self._link(source_path, dest_path)
+                return
+            except OSError:
+                if os.path.lexists(dest_path):
+                    os.unlink(dest_path)
+        shutil.copy2(source_path, dest_path)
+
     def store(self, source_path: Path | str, citation_key: str) -> str:
         source_path = Path(source_path)
         if not source_path.exists():
@@ -28,13 +102,13 @@ class PaperFiles:
         fd, tmp_path = tempfile.mkstemp(dir=paper_dir, suffix=".tmp")
         try:
             os.close(fd)
-            shutil.copy2(source_path, tmp_path)
+            self._ingest_file(source_path, tmp_path)
             os.rename(tmp_path, dest_path)
         except:
-            if os.path.exists(tmp_path):
+            if os.path.lexists(tmp_path):
                 os.unlink(tmp_path)
             raise
-        return f"{citation_key}/paper.pdf"
+        return self.relative_path(citation_key)
 
     def rename(self, old_key: str, new_key: str) -> str | None:
         old_dir = self._paper_dir(old_key)
@@ -42,7 +116,7 @@ class PaperFiles:
             return None
         new_dir = self._paper_dir(new_key)
         os.rename(old_dir, new_dir)
-        return f"{new_key}/paper.pdf"
+        return self.relative_path(new_key)
 
     def delete(self, citation_key: str) -> bool:
         paper_dir = self._paper_dir(citation_key)
@@ -52,10 +126,79 @@ class PaperFiles:
         return False
 
     def list_folders(self) -> list[str]:
-        return [
-            d.name for d in self._files_dir.iterdir()
-            if d.is_dir() and (d / "paper.pdf").exists()
-        ]
+        with os.scandir(self._files_dir) as entries:
+            return [
+                entry.name for entry in entries
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, "paper.pdf"))
+            ]
+
+    def _sibling(self, suffix: str) -> Path:
+        return self._files_dir.with_name(self._files_dir.name + suffix)
+
+    def shadow(self) -> "PaperFiles":
+        shadow_dir = self._sibling(SHADOW_SUFFIX)
+        if shadow_dir.exists():
+            shutil.rmtree(shadow_dir)
+        shadow = PaperFiles(shadow_dir, self._ingest)
+        for folder in self.list_folders():
+            source_path = self.get_path(folder)
+            dest_path = shadow.get_path(folder)
+            dest_path.parent.mkdir()
+            try:
+                os.link(source_path, dest_path, follow_symlinks=False)
+            except OSError:
+                shutil.copy2(source_path, dest_path, follow_symlinks=False)
+        return shadow
+
+    def discard(self):
+        if self._files_dir.exists():
+            shutil.rmtree(self._files_dir)
+
+    def seal(self):
+        with open(self._files_dir / SEAL_NAME, "w") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _swap_in(self, shadow_dir: Path):
+        if exchange(shadow_dir, self._files_dir):
+            shutil.rmtree(shadow_dir)
+        else:
+            retired_dir = self._sibling(RETIRED_SUFFIX)
+            if retired_dir.exists():
+                shutil.rmtree(retired_dir)
+            if self._files_dir.exists():
+                os.rename(self._files_dir, retired_dir)
+            os.rename(shadow_dir, self._files_dir)
+            if retired_dir.exists():
+                shutil.rmtree(retired_dir)
+        os.unlink(self._files_dir / SEAL_NAME)
+
+    def replace_with(self, shadow: "PaperFiles"):
+        if not (shadow.files_dir / SEAL_NAME).exists():
+            shadow.seal()
+        self._swap_in(shadow.files_dir)
+
+    def sealed_shadow(self) -> bool:
+        return (self._sibling(SHADOW_SUFFIX) / SEAL_NAME).exists()
+
+    def recover(self) -> bool:
+        shadow_dir = self._sibling(SHADOW_SUFFIX)
+        retired_dir = self._sibling(RETIRED_SUFFIX)
+        recovered = False
+        if (shadow_dir / SEAL_NAME).exists():
+            self._swap_in(shadow_dir)
+            recovered = True
+        elif shadow_dir.exists():
+            shutil.rmtree(shadow_dir)
+            recovered = True
+        if retired_dir.exists():
+            shutil.rmtree(retired_dir)
+            recovered = True
+        if (self._files_dir / SEAL_NAME).exists():
+            os.unlink(self._files_dir / SEAL_NAME)
+            recovered = True
+        self._files_dir.mkdir(parents=True, exist_ok=True)
+        return recovered
 
     def delete_all(self) -> int:
         count = 0
@@ -0,0 +1,12 @@
+from .migrations import register
+
+
+@register(2)
+def migration_002(conn, context: dict):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            source     TEXT PRIMARY KEY,
+            watermark  TEXT,
+            updated_at TEXT
+        )
+    """)
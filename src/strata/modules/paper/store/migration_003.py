@@ -0,0 +1,20 @@
+from .migrations import register
+
+
+@register(3)
+def migration_003(conn, context: dict):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS paper_source_keys (
+            source_key   TEXT PRIMARY KEY,
+            citation_key TEXT NOT NULL
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_paper_source_keys_citation_key ON paper_source_keys(citation_key)"
+    )
+    conn.execute("""
+        INSERT OR REPLACE INTO paper_source_keys (source_key, citation_key)
+        SELECT j.value, p.citation_key
+        FROM papers p, json_each(p.source_keys) j
+        ORDER BY p.deleted_at IS NULL
+    """)
@@ -0,0 +1,6 @@
+from .migrations import register
+
+
+@register(4)
+def migration_004(conn, context: dict):
+    conn.execute("ALTER TABLE papers ADD COLUMN content_hash TEXT")
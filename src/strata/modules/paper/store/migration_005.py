@@ -0,0 +1,14 @@
+from .migrations import register
+
+
+@register(5)
+def migration_005(conn, context: dict):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS paper_files (
+            citation_key  TEXT PRIMARY KEY,
+            source_path   TEXT NOT NULL,
+            size          INTEGER NOT NULL,
+            mtime_ns      INTEGER NOT NULL,
+            content_hash  TEXT NOT NULL
+        )
+    """)
@@ -0,0 +1,26 @@
+from .migrations import register
+
+
+@register(6)
+def migration_006(conn, context: dict):
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+            INSERT INTO papers_fts(rowid, title, abstract, authors)
+            VALUES (new.rowid, new.title, COALESCE(new.abstract, ''), COALESCE(new.authors, ''));
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+            INSERT INTO papers_fts(papers_fts, rowid, title, abstract, authors)
+            VALUES ('delete', old.rowid, old.title, COALESCE(old.abstract, ''), COALESCE(old.authors, ''));
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstract, authors ON papers
+        WHEN old.title IS NOT new.title OR old.abstract IS NOT new.abstract OR old.authors IS NOT new.authors
+        BEGIN
+            INSERT INTO papers_fts(papers_fts, rowid, title, abstract, authors)
+            VALUES ('delete', old.rowid, old.title, COALESCE(old.abstract, ''), COALESCE(old.authors, ''));
+            INSERT INTO papers_fts(rowid, title, abstract, authors)
+            VALUES (new.rowid, new.title, COALESCE(new.abstract, ''), COALESCE(new.authors, ''));
+        END;
+    """)
+    conn.execute("INSERT INTO papers_fts(papers_fts) VALUES('rebuild')")
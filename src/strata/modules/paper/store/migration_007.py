@@ -0,0 +1,19 @@
+from .migrations import register
+
+
+@register(7)
+def migration_007(conn, context: dict):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS paper_minhash (
+            citation_key  TEXT PRIMARY KEY,
+            content_hash  TEXT,
+            signature     BLOB NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS paper_lsh (
+            band          INTEGER NOT NULL,
+            bucket        INTEGER NOT NULL,
+            citation_key  TEXT NOT NULL,
+            PRIMARY KEY (band, bucket, citation_key)
+        ) WITHOUT ROWID;
+    """)
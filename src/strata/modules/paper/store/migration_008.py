@@ -0,0 +1,11 @@
+from .migrations import register
+
+
+@register(8)
+def migration_008(conn, context: dict):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS store_markers (
+            name    TEXT PRIMARY KEY,
+            value   TEXT
+        )
+    """)
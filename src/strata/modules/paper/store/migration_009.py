@@ -0,0 +1,45 @@
+from .migrations import register
+
+
+@register(9)
+def migration_009(conn, context: dict):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS paper_authors (
+            citation_key  TEXT NOT NULL,
+            position      INTEGER NOT NULL,
+            last_name     TEXT NOT NULL COLLATE NOCASE,
+            first_name    TEXT NOT NULL COLLATE NOCASE,
+            role          TEXT NOT NULL,
+            PRIMARY KEY (citation_key, position)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS paper_tags (
+            tag           TEXT NOT NULL,
+            citation_key  TEXT NOT NULL,
+            PRIMARY KEY (tag, citation_key)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS paper_collections (
+            collection    TEXT NOT NULL,
+            citation_key  TEXT NOT NULL,
+            PRIMARY KEY (collection, citation_key)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_paper_authors_last_name ON paper_authors(last_name);
+        CREATE INDEX IF NOT EXISTS idx_paper_authors_first_name ON paper_authors(first_name);
+        CREATE INDEX IF NOT EXISTS idx_paper_tags_citation_key ON paper_tags(citation_key);
+        CREATE INDEX IF NOT EXISTS idx_paper_collections_citation_key ON paper_collections(citation_key);
+
+        INSERT OR IGNORE INTO paper_authors (citation_key, position, last_name, first_name, role)
+        SELECT p.citation_key, j.key,
+               COALESCE(json_extract(j.value, '$.last_name'), ''),
+               COALESCE(json_extract(j.value, '$.first_name'), ''),
+               COALESCE(json_extract(j.value, '$.role'), 'author')
+        FROM papers p, json_each(p.authors) j;
+
+        INSERT OR IGNORE INTO paper_tags (tag, citation_key)
+        SELECT j.value, p.citation_key FROM papers p, json_each(p.source_tags) j;
+
+        INSERT OR IGNORE INTO paper_collections (collection, citation_key)
+        SELECT j.value, p.citation_key FROM papers p, json_each(p.source_collections) j;
+    """)
@@ -0,0 +1,50 @@
+from ..utils import fold_name
+from .migrations import register
+
+
+@register(10)
+def migration_010(conn, context: dict):
+    conn.create_function("fold_name", 1, fold_name, deterministic=True)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS author_names (
+            id            INTEGER PRIMARY KEY,
+            last_name     TEXT NOT NULL,
+            first_name    TEXT NOT NULL,
+            last_folded   TEXT NOT NULL,
+            first_folded  TEXT NOT NULL,
+            full_folded   TEXT NOT NULL,
+            UNIQUE (last_folded, first_folded)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_author_names_first_folded ON author_names(first_folded);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS author_names_fts USING fts5(
+            full_folded, content='author_names', content_rowid='id', tokenize='trigram'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS author_names_fts_insert AFTER INSERT ON author_names BEGIN
+            INSERT INTO author_names_fts(rowid, full_folded) VALUES (new.id, new.full_folded);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS author_names_fts_delete AFTER DELETE ON author_names BEGIN
+            INSERT INTO author_names_fts(author_names_fts, rowid, full_folded)
+            VALUES ('delete', old.id, old.full_folded);
+        END;
+
+        ALTER TABLE paper_authors ADD COLUMN name_id INTEGER;
+        DROP INDEX IF EXISTS idx_paper_authors_last_name;
+        DROP INDEX IF EXISTS idx_paper_authors_first_name;
+
+        INSERT OR IGNORE INTO author_names (last_name, first_name, last_folded, first_folded, full_folded)
+        SELECT last_name, first_name, fold_name(last_name), fold_name(first_name),
+               TRIM(fold_name(first_name) || ' ' || fold_name(last_name))
+        FROM paper_authors;
+
+        UPDATE paper_authors SET name_id = (
+            SELECT id FROM author_names n
+            WHERE n.last_folded = fold_name(paper_authors.last_name)
+            AND n.first_folded = fold_name(paper_authors.first_name)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_paper_authors_name_id ON paper_authors(name_id);
+    """)
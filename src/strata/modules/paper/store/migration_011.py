@@ -0,0 +1,100 @@
+from .migrations import register
+
+
+@register(11)
+def migration_011(conn, context: dict):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS paper_facets (
+            facet   TEXT NOT NULL,
+            value   NOT NULL,
+            papers  INTEGER NOT NULL,
+            PRIMARY KEY (facet, value)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS paper_facets_prune AFTER UPDATE OF papers ON paper_facets
+        WHEN new.papers <= 0
+        BEGIN
+            DELETE FROM paper_facets WHERE facet = new.facet AND value = new.value;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_facets_insert AFTER INSERT ON papers
+        WHEN new.deleted_at IS NULL
+        BEGIN
+            INSERT INTO paper_facets (facet, value, papers)
+            SELECT 'venue', new.venue, 1 WHERE new.venue != ''
+            UNION ALL SELECT 'year', new.year, 1 WHERE new.year IS NOT NULL
+            UNION ALL SELECT 'pdf', new.pdf_path IS NOT NULL, 1
+            UNION ALL SELECT 'tag', tag, 1 FROM paper_tags WHERE citation_key = new.citation_key
+            UNION ALL SELECT 'collection', collection, 1 FROM paper_collections WHERE citation_key = new.citation_key
+            ON CONFLICT (facet, value) DO UPDATE SET papers = papers + excluded.papers;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_facets_delete AFTER DELETE ON papers
+        WHEN old.deleted_at IS NULL
+        BEGIN
+            INSERT INTO paper_facets (facet, value, papers)
+            SELECT 'venue', old.venue, -1 WHERE old.venue != ''
+            UNION ALL SELECT 'year', old.year, -1 WHERE old.year IS NOT NULL
+            UNION ALL SELECT 'pdf', old.pdf_path IS NOT NULL, -1
+            UNION ALL SELECT 'tag', tag, -1 FROM paper_tags WHERE citation_key = old.citation_key
+            UNION ALL SELECT 'collection', collection, -1 FROM paper_collections WHERE citation_key = old.citation_key
+            ON CONFLICT (facet, value) DO UPDATE SET papers = papers + excluded.papers;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_facets_update AFTER UPDATE OF deleted_at, venue, year, pdf_path ON papers
+        WHEN (old.deleted_at IS NULL) != (new.deleted_at IS NULL)
+            OR (new.deleted_at IS NULL AND (
+                old.venue IS NOT new.venue OR old.year IS NOT new.year
+                OR (old.pdf_path IS NULL) != (new.pdf_path IS NULL)
+            ))
+        BEGIN
+            INSERT INTO paper_facets (facet, value, papers)
+            SELECT 'venue', old.venue, -1 WHERE old.deleted_at IS NULL AND old.venue != ''
+            UNION ALL SELECT 'year', old.year, -1 WHERE old.deleted_at IS NULL AND old.year IS NOT NULL
+            UNION ALL SELECT 'pdf', old.pdf_path IS NOT NULL, -1 WHERE old.deleted_at IS NULL
+            UNION ALL SELECT 'venue', new.venue, 1 WHERE new.deleted_at IS NULL AND new.venue != ''
+            UNION ALL SELECT 'year', new.year, 1 WHERE new.deleted_at IS NULL AND new.year IS NOT NULL
+            UNION ALL SELECT 'pdf', new.pdf_path IS NOT NULL, 1 WHERE new.deleted_at IS NULL
+            UNION ALL SELECT 'tag', tag, IIF(new.deleted_at IS NULL, 1, -1) FROM paper_tags
+                WHERE citation_key = new.citation_key AND (old.deleted_at IS NULL) != (new.deleted_at IS NULL)
+            UNION ALL SELECT 'collection', collection, IIF(new.deleted_at IS NULL, 1, -1) FROM paper_collections
+                WHERE citation_key = new.citation_key AND (old.deleted_at IS NULL) != (new.deleted_at IS NULL)
+            ON CONFLICT (facet, value) DO UPDATE SET papers = papers + excluded.papers;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS paper_tags_facets_insert AFTER INSERT ON paper_tags
+        WHEN EXISTS (SELECT 1 FROM papers WHERE citation_key = new.citation_key AND deleted_at IS NULL)
+        BEGIN
+            INSERT INTO paper_facets (facet, value, papers) VALUES ('tag', new.tag, 1)
+            ON CONFLICT (facet, value) DO UPDATE SET papers = papers + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS paper_tags_facets_delete AFTER DELETE ON paper_tags
+        WHEN EXISTS (SELECT 1 FROM papers WHERE citation_key = old.citation_key AND deleted_at IS NULL)
+        BEGIN
+            UPDATE paper_facets SET papers = papers - 1 WHERE facet = 'tag' AND value = old.tag;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS paper_collections_facets_insert AFTER INSERT ON paper_collections
+        WHEN EXISTS (SELECT 1 FROM papers WHERE citation_key = new.citation_key AND deleted_at IS NULL)
+        BEGIN
+            INSERT INTO paper_facets (facet, value, papers) VALUES ('collection', new.collection, 1)
+            ON CONFLICT (facet, value) DO UPDATE SET papers = papers + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS paper_collections_facets_delete AFTER DELETE ON paper_collections
+        WHEN EXISTS (SELECT 1 FROM papers WHERE citation_key = old.citation_key AND deleted_at IS NULL)
+        BEGIN
+            UPDATE paper_facets SET papers = papers - 1 WHERE facet = 'collection' AND value = old.collection;
+        END;
+
+        DELETE FROM paper_facets;
+        INSERT INTO paper_facets (facet, value, papers)
+        SELECT 'venue', venue, COUNT(*) FROM papers WHERE deleted_at IS NULL AND venue != '' GROUP BY venue
+        UNION ALL SELECT 'year', year, COUNT(*) FROM papers WHERE deleted_at IS NULL AND year IS NOT NULL GROUP BY year
+        UNION ALL SELECT 'pdf', pdf_path IS NOT NULL, COUNT(*) FROM papers WHERE deleted_at IS NULL GROUP BY 2
+        UNION ALL SELECT 'tag', t.tag, COUNT(*) FROM paper_tags t JOIN papers p ON p.citation_key = t.citation_key
+            WHERE p.deleted_at IS NULL GROUP BY t.tag
+        UNION ALL SELECT 'collection', c.collection, COUNT(*) FROM paper_collections c JOIN papers p ON p.citation_key = c.citation_key
+            WHERE p.deleted_at IS NULL GROUP BY c.collection;
+    """)
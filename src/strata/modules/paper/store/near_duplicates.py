@@ -0,0 +1,173 @@
+import hashlib
+import json
+import random
+from array import array
+
+from ..utils import normalize_title
+from .database import ConnectionSource
+
+NUM_PERM = 64
+BANDS = 16
+MAX_BUCKET = 50
+REFRESH_BATCH = 500
+BUCKET_MASK = (1 << 63) - 1
+
+_MASKS = [random.Random(0x5EED + i).getrandbits(64) for i in range(NUM_PERM)]
+
+
+def _hash(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def shingles(title: str | None, surnames: list[str]) -> set[str]:
+    grams = set((normalize_title(title) or "").split())
+    for surname in surnames:
+        normalized = normalize_title(surname)
+        if normalized:
+            grams.add(f"@{normalized}")
+    return grams
+
+
+def signature(grams: set[str]) -> list[int]:
+    if not grams:
+        return []
+    hashes = [_hash(gram.encode()) for gram in grams]
+    return [min([h ^ mask for h in hashes]) for mask in _MASKS]
+
+
+def similarity(left: list[int], right: list[int]) -> float:
+    if not left or not right:
+        return 0.0
+    return sum(1 for a, b in zip(left, right) if a == b) / NUM_PERM
+
+
+def _bands(packed: bytes) -> list[tuple[int, int]]:
+    width = len(packed) // BANDS
+    return [
+        (band, _hash(packed[band * width:(band + 1) * width]) & BUCKET_MASK)
+        for band in range(BANDS)
+    ]
+
+
+def _surnames(authors_json: str | None) -> list[str]:
+    if not authors_json:
+        return []
+    return [a.get("last_name", "") for a in json.loads(authors_json) if a.get("role", "author") == "author"]
+
+
+class NearDuplicateIndex:
+    def __init__(self, db: ConnectionSource):
+        self._db = db
+
+    def _drop(self, conn, stale: list[tuple[str, bytes]]):
+        conn.executemany(
+            "DELETE FROM paper_lsh WHERE band = ? AND bucket = ? AND citation_key = ?",
+            [
+                (band, bucket, citation_key)
+                for citation_key, packed in stale if packed
+                for band, bucket in _bands(packed)
+            ],
+        )
+        conn.executemany("DELETE FROM paper_minhash WHERE citation_key = ?", [(key,) for key, _ in stale])
+
+    def refresh(self) -> list[str]:
+        conn = self._db.connection()
+        self._drop(conn, conn.execute(
+            """SELECT m.citation_key, m.signature FROM paper_minhash m
+               LEFT JOIN papers p ON p.citation_key = m.citation_key
+               WHERE p.citation_key IS NULL OR p.deleted_at IS NOT NULL"""
+        ).fetchall())
+        refreshed = []
+        last = ""
+        while rows := conn.execute(
+            """SELECT p.citation_key, p.title, p.authors, p.content_hash, m.signature
+               FROM papers p
+               LEFT JOIN paper_minhash m ON m.citation_key = p.citation_key
+               WHERE p.deleted_at IS NULL AND p.citation_key > ?
+               AND (m.citation_key IS NULL OR m.content_hash IS NOT p.content_hash)
+               ORDER BY p.citation_key LIMIT ?""",
+            (last, REFRESH_BATCH),
+        ).fetchall():
+            signatures = []
+            buckets = []
+            stale = []
+            for citation_key, title, authors, content_hash, previous in rows:
+                packed = array("Q", signature(shingles(title, _surnames(authors)))).tobytes()
+                signatures.append((citation_key, content_hash, packed))
+                if previous is not None:
+                    stale.append((citation_key, previous))
+                if packed:
+                    buckets.extend((band, bucket, citation_key) for band, bucket in _bands(packed))
+            self._drop(conn, stale)
+            conn.executemany(
+                "INSERT INTO paper_minhash (citation_key, content_hash, signature) VALUES (?, ?, ?)",
+                signatures,
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO paper_lsh (band, bucket, citation_key) VALUES (?, ?, ?)",
+                buckets,
+            )
+            refreshed.extend(citation_key for citation_key, _, _ in signatures)
+            last = rows[-1][0]
+        return refreshed
+
+    def _signatures(self, citation_keys: set[str]) -> dict[str, list[int]]:
+        conn = self._db.connection()
+        keys = list(citation_keys)
+        signatures = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT citation_key, signature FROM paper_minhash WHERE citation_key IN ({placeholders})",
+                chunk,
+            )
+            signatures.update((row[0], array("Q", row[1]).tolist()) for row in cursor)
+        return signatures
+
+    def _buckets(self, citation_keys: list[str] | None):
+        conn = self._db.connection()
+        if citation_keys is None:
+            cursor = conn.execute(
+                """SELECT group_concat(citation_key, char(31)) FROM paper_lsh
+                   GROUP BY band, bucket HAVING COUNT(*) BETWEEN 2 AND ?""",
+                (MAX_BUCKET,),
+            )
+            for (members,) in cursor:
+                yield members.split("\x1f")
+            return
+        signatures = self._signatures(set(citation_keys))
+        bands = {
+            band
+            for sig in signatures.values() if sig
+            for band in _bands(array("Q", sig).tobytes())
+        }
+        for band, bucket in bands:
+            members = [
+                row[0] for row in conn.execute(
+                    "SELECT citation_key FROM paper_lsh WHERE band = ? AND bucket = ?",
+                    (band, bucket),
+                )
+            ]
+            if 2 <= len(members) <= MAX_BUCKET:
+                yield members
+
+    def find_pairs(
+        self, threshold: float = 0.7, citation_keys: list[str] | None = None
+    ) -> list[tuple[str, str, float]]:
+        candidates: set[tuple[str, str]] = set()
+        scope = set(citation_keys) if citation_keys is not None else None
+        for members in self._buckets(citation_keys):
+            keys = sorted(members)
+            candidates.update(
+                (keys[i], keys[j]) for i in range(len(keys)) for j in range(i + 1, len(keys))
+                if scope is None or keys[i] in scope or keys[j] in scope
+            )
+        signatures = self._signatures({key for pair in candidates for key in pair})
+        pairs = []
+        for left, right in candidates:
+            score = similarity(signatures.get(left, []), signatures.get(right, []))
+            if score >= threshold:
+                pairs.append((left, right, score))
+        pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+        return pairs
@@ -0,0 +1,59 @@
+from pydantic import BaseModel
+
+from .files import PaperFiles
+from .repository import PaperRepository
+
+
+class ReconcileReport(BaseModel):
+    total: int = 0
+    folders: int = 0
+    orphan_folders: list[str] = []
+    missing_pdfs: list[str] = []
+    stale_paths: list[tuple[str, str]] = []
+    no_pdf: list[str] = []
+
+    @property
+    def has_anomalies(self) -> bool:
+        return bool(self.orphan_folders or self.missing_pdfs or self.stale_paths)
+
+
+class FileReconciler:
+    def __init__(self, repo: PaperRepository, files: PaperFiles):
+        self._repo = repo
+        self._files = files
+
+    def scan(self) -> ReconcileReport:
+        folders = set(self._files.list_folders())
+        report = ReconcileReport(folders=len(folders))
+        active: set[str] = set()
+        for citation_key, pdf_path, deleted in self._repo.list_pdf_paths():
+            if deleted:
+                continue
+            active.add(citation_key)
+            expected = self._files.relative_path(citation_key)
+            if citation_key in folders:
+                if pdf_path != expected:
+                    report.stale_paths.append((citation_key, expected))
+            elif pdf_path:
+                report.missing_pdfs.append(citation_key)
+            else:
+                report.no_pdf.append(citation_key)
+        report.total = len(active)
+        report.orphan_folders = sorted(folders - active)
+        report.missing_pdfs.sort()
+        report.stale_paths.sort()
+        report.no_pdf.sort()
+        return report
+
+    def apply(self, report: ReconcileReport) -> ReconcileReport:
+        for folder in report.orphan_folders:
+            self._files.delete(folder)
+        self._repo.set_pdf_paths(
+            [(citation_key, None) for citation_key in report.missing_pdfs] + report.stale_paths
+        )
+        self._repo.delete_file_manifest(report.orphan_folders + report.missing_pdfs)
+        self._repo.commit()
+        return report
+
+    def reconcile(self) -> ReconcileReport:
+        return self.apply(self.scan())
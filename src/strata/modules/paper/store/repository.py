@@ -1,11 +1,43 @@
+import json
+import sqlite3
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
 from ..entities import Paper, Author
-from .database import PaperDatabase
+from ..utils import fold_name, edit_distance
+from .database import ConnectionSource
+
+INSERT_PAPER_SQL = """
+    INSERT INTO papers (
+        citation_key, item_type, title, authors, year,
+        journal, volume, issue, pages, doi, url, abstract,
+        publisher, book_title, source_keys, source_tags, source_collections,
+        pdf_path, arxiv_id, venue, imported_at, synced_at, content_hash
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+BULK_CACHE_SIZE = -262144
+RELATION_TABLES = ("paper_authors", "paper_tags", "paper_collections")
+FUZZY_MIN_LENGTH = 4
+FUZZY_CANDIDATES = 1000
+FUZZY_TRIGRAM_LENGTH = 7
+FACETS = ("tag", "collection", "venue", "year", "pdf")
+
+
+def _one_edit_globs(word: str) -> list[str]:
+    chars = ["[" + ch + "]" if ch in "*?[" else ch for ch in word]
+    patterns = {"".join(chars[:i] + chars[i + 1 :]) for i in range(len(chars))}
+    patterns.update("".join(chars[:i] + ["?"] + chars[i:]) for i in range(1, len(chars) + 1))
+    patterns.update("".join(chars[:i] + ["?"] + chars[i + 1 :]) for i in range(1, len(chars)))
+    patterns.update(
+        "".join(chars[:i] + [chars[i + 1], chars[i]] + chars[i + 2 :])
+        for i in range(len(chars) - 1)
+        if chars[i] != chars[i + 1]
+    )
+    return sorted(patterns)
 
 
 class PaperRepository:
-    def __init__(self, db: PaperDatabase):
+    def __init__(self, db: ConnectionSource):
         self._db = db
 
     def _now(self) -> str:
@@ -36,6 +68,51 @@ class PaperRepository:
             imported_at=row["imported_at"],
             synced_at=row["synced_at"],
             deleted_at=row["deleted_at"],
+            content_hash=row["content_hash"],
+        )
+
+    def _write_source_keys(self, paper: Paper):
+        conn = self._db.connection()
+        conn.execute("DELETE FROM paper_source_keys WHERE citation_key = ?", (paper.citation_key,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO paper_source_keys (source_key, citation_key) VALUES (?, ?)",
+            [(source_key, paper.citation_key) for source_key in paper.source_keys],
+        )
+
+    def _write_relations(self, papers: list[Paper], replace: bool = True):
+        conn = self._db.connection()
+        if replace:
+            keys = [(paper.citation_key,) for paper in papers]
+            for table in RELATION_TABLES:
+                conn.executemany(f"DELETE FROM {table} WHERE citation_key = ?", keys)
+        authors = [
+            (paper.citation_key, position, author, fold_name(author.last_name), fold_name(author.first_name))
+            for paper in papers
+            for position, author in enumerate(paper.authors)
+        ]
+        conn.executemany(
+            """INSERT OR IGNORE INTO author_names (last_name, first_name, last_folded, first_folded, full_folded)
+               VALUES (?, ?, ?, ?, ?)""",
+            [
+                (author.last_name, author.first_name, last, first, f"{first} {last}".strip())
+                for _, _, author, last, first in authors
+            ],
+        )
+        conn.executemany(
+            """INSERT INTO paper_authors (citation_key, position, last_name, first_name, role, name_id)
+               VALUES (?, ?, ?, ?, ?, (SELECT id FROM author_names WHERE last_folded = ? AND first_folded = ?))""",
+            [
+                (citation_key, position, author.last_name, author.first_name, author.role, last, first)
+                for citation_key, position, author, last, first in authors
+            ],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO paper_tags (tag, citation_key) VALUES (?, ?)",
+            [(tag, paper.citation_key) for paper in papers for tag in paper.source_tags],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO paper_collections (collection, citation_key) VALUES (?, ?)",
+            [(collection, paper.citation_key) for paper in papers for collection in paper.source_collections],
         )
 
     def begin(self):
@@ -59,7 +136,9 @@ class PaperRepository:
     def get_by_source_key(self, source_key: str) -> Paper | None:
         conn = self._db.connection()
         cursor = conn.execute(
-            "SELECT p.* FROM papers p, json_each(p.source_keys) j WHERE j.value = ? AND p.deleted_at IS NULL",
+            """SELECT p.* FROM paper_source_keys sk
+               JOIN papers p ON p.citation_key = sk.citation_key
+               WHERE sk.source_key = ? AND p.deleted_at IS NULL""",
             (source_key,),
         )
         row = cursor.fetchone()
@@ -72,23 +151,125 @@ class PaperRepository:
         )
         return [self._row_to_paper(dict(row)) for row in cursor]
 
-    def find(
-        self,
-        query: str | None = None,
-        arxiv_id: str | None = None,
-        year_from: int | None = None,
-        year_to: int | None = None,
-        author: str | None = None,
-        venue: str | None = None,
-        tag: str | None = None,
-        sort_by: str = "relevance",
-        limit: int = 20,
-        offset: int = 0,
-    ) -> tuple[list[Paper], int]:
+    def _fuzzy_name_scores(self, full: str) -> list[tuple[int, int]]:
+        compact = full.replace(" ", "")
+        if len(compact) < FUZZY_MIN_LENGTH:
+            return []
+        budget = max(1, len(compact) // 4)
         conn = self._db.connection()
+        if len(compact) < FUZZY_TRIGRAM_LENGTH:
+            patterns = _one_edit_globs(compact)
+            cursor = conn.execute(
+                f"""WITH RECURSIVE initials(ch) AS (
+                       SELECT substr(MIN(last_folded), 1, 1) FROM author_names WHERE last_folded > ''
+                       UNION ALL
+                       SELECT (SELECT substr(MIN(last_folded), 1, 1) FROM author_names
+                               WHERE last_folded > ch || char(1114111))
+                       FROM initials WHERE ch IS NOT NULL
+                   )
+                   SELECT n.id, n.last_folded, n.first_folded
+                   FROM initials i JOIN author_names n ON n.last_folded IN (i.ch || ?, i.ch || ?)
+                   {"UNION SELECT id, last_folded, first_folded FROM author_names WHERE last_folded GLOB ? " * len(patterns)}""",
+                (compact[1:], compact, *patterns),
+            )
+        else:
+            window = (len(compact) - budget, len(compact) + budget) * 2
+            trigrams = sorted({compact[i : i + 3] for i in range(len(compact) - 2)})
+            cursor = conn.execute(
+                """SELECT n.id, n.last_folded, n.first_folded
+                   FROM author_names_fts f JOIN author_names n ON n.id = f.rowid
+                   WHERE author_names_fts MATCH ?
+                   AND (length(replace(n.last_folded, ' ', '')) BETWEEN ? AND ?
+                        OR length(replace(n.full_folded, ' ', '')) BETWEEN ? AND ?)
+                   ORDER BY f.rank LIMIT ?""",
+                (" OR ".join(f'"{trigram}"' for trigram in trigrams), *window, FUZZY_CANDIDATES),
+            )
+        scores = []
+        for name_id, last, first in cursor:
+            last, first = last.replace(" ", ""), first.replace(" ", "")
+            distance = min(edit_distance(compact, form, budget) for form in (last, first + last, last + first))
+            if distance <= budget:
+                scores.append((name_id, 5 + distance))
+        return scores
+
+    def _author_name_hits(self, author: str, fuzzy: bool = True) -> tuple[str, list]:
+        if "," in author:
+            last, _, given = author.partition(",")
+        else:
+            *given, last = author.split() or [""]
+            given = " ".join(given)
+        last, given, full = fold_name(last), fold_name(given), fold_name(author)
+        if not last:
+            last, given = given, ""
+        if not last:
+            return "SELECT NULL AS id, 0 AS score WHERE 0", []
+
+        branches = ["SELECT id, CASE WHEN last_folded = ? THEN 0 ELSE 1 END AS score FROM author_names WHERE last_folded GLOB ?"]
+        params: list = [last, f"{last}*"]
+        if given:
+            branches[0] += " AND first_folded GLOB ?"
+            params.append(f"{given}*")
+        else:
+            branches.append(
+                "SELECT id, CASE WHEN first_folded = ? THEN 2 ELSE 3 END FROM author_names WHERE first_folded GLOB ?"
+            )
+            params.extend([last, f"{last}*"])
+        if len(full) >= 3:
+            branches.append("SELECT rowid, 4 FROM author_names_fts WHERE author_names_fts MATCH ?")
+            params.append(f'"{full}"')
+        if fuzzy and (scores := self._fuzzy_name_scores(full)):
+            branches.append("SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)")
+            params.append(json.dumps(scores))
+        return " UNION ALL ".join(branches), params
+
+    def _author_hits(self, author: str) -> tuple[str, list]:
+        names, params = self._author_name_hits(author, fuzzy=False)
+        exact = self._db.connection().execute(
+            f"""SELECT 1 FROM ({names}) n JOIN paper_authors a ON a.name_id = n.id
+                JOIN papers p ON p.citation_key = a.citation_key
+                WHERE p.deleted_at IS NULL LIMIT 1""",
+            params,
+        ).fetchone()
+        if not exact:
+            names, params = self._author_name_hits(author)
+        sql = f"""SELECT a.citation_key, MIN(n.score * 2 + (a.position > 0)) AS score
+                  FROM ({names}) n JOIN paper_authors a ON a.name_id = n.id
+                  GROUP BY a.citation_key"""
+        return sql, params
+
+    def suggest_authors(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        conn = self._db.connection()
+        names, params = self._author_name_hits(prefix)
+        cursor = conn.execute(
+            f"""SELECT n.first_name, n.last_name, h.score,
+                       (SELECT COUNT(*) FROM paper_authors a WHERE a.name_id = h.id) AS papers
+                FROM (SELECT id, MIN(score) AS score FROM ({names}) GROUP BY id) h
+                JOIN author_names n ON n.id = h.id
+                WHERE EXISTS (
+                    SELECT 1 FROM paper_authors a JOIN papers p ON p.citation_key = a.citation_key
+                    WHERE a.name_id = h.id AND p.deleted_at IS NULL
+                )
+                ORDER BY h.score, papers DESC, n.last_name, n.first_name
+                LIMIT ?""",
+            params + [limit],
+        )
+        return [(" ".join(filter(None, (row[0], row[1]))), row[3]) for row in cursor]
+
+    def _filters(
+        self,
+        query: str | None,
+        arxiv_id: str | None,
+        year_from: int | None,
+        year_to: int | None,
+        author: str | None,
+        venue: str | None,
+        tag: str | None,
+        collection: str | None,
+    ) -> tuple[str, list[str], list]:
         conditions = ["p.deleted_at IS NULL"]
         params: list = []
         use_fts = bool(query and query.strip())
+        use_author = bool(author and author.strip())
 
         if use_fts:
             from_clause = "papers p JOIN papers_fts ON papers_fts.rowid = p.rowid"
@@ -97,6 +278,11 @@ class PaperRepository:
         else:
             from_clause = "papers p"
 
+        if use_author:
+            hits_sql, hits_params = self._author_hits(author)
+            from_clause += f" JOIN ({hits_sql}) ah ON ah.citation_key = p.citation_key"
+            params = hits_params + params
+
         if arxiv_id:
             conditions.append("p.arxiv_id = ?")
             params.append(arxiv_id)
@@ -106,19 +292,43 @@ class PaperRepository:
         if year_to is not None:
             conditions.append("p.year <= ?")
             params.append(year_to)
-        if author:
-            conditions.append("p.authors LIKE ?")
-            params.append(f"%{author}%")
         if venue:
             conditions.append("p.venue = ?")
             params.append(venue)
         if tag:
-            conditions.append("EXISTS (SELECT 1 FROM json_each(p.source_tags) j WHERE j.value = ?)")
+            conditions.append("p.citation_key IN (SELECT citation_key FROM paper_tags WHERE tag = ?)")
             params.append(tag)
+        if collection:
+            conditions.append("p.citation_key IN (SELECT citation_key FROM paper_collections WHERE collection = ?)")
+            params.append(collection)
 
+        return from_clause, conditions, params
+
+    def find(
+        self,
+        query: str | None = None,
+        arxiv_id: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        author: str | None = None,
+        venue: str | None = None,
+        tag: str | None = None,
+        collection: str | None = None,
+        sort_by: str = "relevance",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[list[Paper], int]:
+        conn = self._db.connection()
+        use_fts = bool(query and query.strip())
+        use_author = bool(author and author.strip())
+        from_clause, conditions, params = self._filters(
+            query, arxiv_id, year_from, year_to, author, venue, tag, collection
+        )
         where_clause = " AND ".join(conditions)
 
-        if sort_by == "relevance" and use_fts:
+        if sort_by == "relevance" and use_author:
+            order = "ORDER BY ah.score, " + ("papers_fts.rank" if use_fts else "p.year DESC, p.citation_key")
+        elif sort_by == "relevance" and use_fts:
             order = "ORDER BY papers_fts.rank"
         elif sort_by == "year":
             order = "ORDER BY p.year DESC, p.citation_key"
@@ -134,6 +344,75 @@ class PaperRepository:
 
         return papers, total
 
+    def facets(
+        self,
+        query: str | None = None,
+        arxiv_id: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        author: str | None = None,
+        venue: str | None = None,
+        tag: str | None = None,
+        collection: str | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        conn = self._db.connection()
+        from_clause, conditions, params = self._filters(
+            query, arxiv_id, year_from, year_to, author, venue, tag, collection
+        )
+        if len(conditions) == 1 and from_clause == "papers p":
+            cursor = conn.execute("SELECT facet, value, papers FROM paper_facets")
+            counts = {(row[0], row[1]): row[2] for row in cursor}
+        else:
+            counts = self._facet_counts(from_clause, conditions, params)
+        result = {facet: [] for facet in FACETS}
+        for (facet, value), count in counts.items():
+            result[facet].append((value, count))
+        for values in result.values():
+            values.sort(key=lambda item: (-item[1], item[0]))
+            if limit is not None:
+                del values[limit:]
+        result["total"] = sum(counts.get(("pdf", value), 0) for value in (0, 1))
+        return result
+
+    def _facet_counts(self, from_clause: str, conditions: list[str], params: list) -> dict[tuple, int]:
+        conn = self._db.connection()
+        cursor = conn.execute(
+            f"""WITH matched AS MATERIALIZED (
+                    SELECT p.citation_key, p.venue, p.year, p.pdf_path IS NOT NULL AS has_pdf
+                    FROM {from_clause} WHERE {" AND ".join(conditions)}
+                )
+                SELECT NULL, NULL, venue, year, has_pdf, COUNT(*) FROM matched GROUP BY venue, year, has_pdf
+                UNION ALL
+                SELECT 'tag', t.tag, NULL, NULL, NULL, COUNT(*)
+                FROM matched m CROSS JOIN paper_tags t ON t.citation_key = m.citation_key GROUP BY t.tag
+                UNION ALL
+                SELECT 'collection', c.collection, NULL, NULL, NULL, COUNT(*)
+                FROM matched m CROSS JOIN paper_collections c ON c.citation_key = m.citation_key GROUP BY c.collection""",
+            params,
+        )
+        counts: dict[tuple, int] = {}
+        for facet, value, venue, year, has_pdf, count in cursor:
+            if facet:
+                counts[facet, value] = count
+                continue
+            keys = [("pdf", has_pdf)]
+            if venue:
+                keys.append(("venue", venue))
+            if year is not None:
+                keys.append(("year", year))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def list_identities(self) -> list[tuple]:
+        conn = self._db.connection()
+        cursor = conn.execute(
+            """SELECT citation_key, doi, arxiv_id, title, authors, year, deleted_at IS NOT NULL
+               FROM papers ORDER BY deleted_at IS NULL"""
+        )
+        return [tuple(row) for row in cursor]
+
     def find_by_doi(self, doi: str) -> Paper | None:
         conn = self._db.connection()
         cursor = conn.execute(
@@ -161,44 +440,49 @@ class PaperRepository:
         row = cursor.fetchone()
         return self._row_to_paper(dict(row)) if row else None
 
+    def _insert_values(self, paper: Paper) -> tuple:
+        return (
+            paper.citation_key,
+            paper.item_type,
+            paper.title,
+            paper.authors_json(),
+            paper.year,
+            paper.journal,
+            paper.volume,
+            paper.issue,
+            paper.pages,
+            paper.doi,
+            paper.url,
+            paper.abstract,
+            paper.publisher,
+            paper.book_title,
+            paper.source_keys_json(),
+            paper.source_tags_json(),
+            paper.source_collections_json(),
+            paper.pdf_path,
+            paper.arxiv_id,
+            paper.venue,
+            paper.imported_at,
+            paper.synced_at,
+            paper.content_hash,
+        )
+
     def insert(self, paper: Paper) -> Paper:
         conn = self._db.connection()
-        conn.execute(
-            """
-            INSERT INTO papers (
-                citation_key, item_type, title, authors, year,
-                journal, volume, issue, pages, doi, url, abstract,
-                publisher, book_title, source_keys, source_tags, source_collections,
-                pdf_path, arxiv_id, venue, imported_at, synced_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                paper.citation_key,
-                paper.item_type,
-                paper.title,
-                paper.authors_json(),
-                paper.year,
-                paper.journal,
-                paper.volume,
-                paper.issue,
-                paper.pages,
-                paper.doi,
-                paper.url,
-                paper.abstract,
-                paper.publisher,
-                paper.book_title,
-                paper.source_keys_json(),
-                paper.source_tags_json(),
-                paper.source_collections_json(),
-                paper.pdf_path,
-                paper.arxiv_id,
-                paper.venue,
-                paper.imported_at,
-                paper.synced_at,
-            ),
-        )
+        conn.execute(INSERT_PAPER_SQL, self._insert_values(paper))
+        self._write_source_keys(paper)
+        self._write_relations([paper], replace=False)
         return paper
 
+    def insert_many(self, papers: list[Paper]):
+        conn = self._db.connection()
+        conn.executemany(INSERT_PAPER_SQL, [self._insert_values(paper) for paper in papers])
+        conn.executemany(
+            "INSERT OR REPLACE INTO paper_source_keys (source_key, citation_key) VALUES (?, ?)",
+            [(source_key, paper.citation_key) for paper in papers for source_key in paper.source_keys],
+        )
+        self._write_relations(papers, replace=False)
+
     def update(self, paper: Paper) -> Paper:
         conn = self._db.connection()
         conn.execute(
@@ -208,7 +492,7 @@ class PaperRepository:
                 journal = ?, volume = ?, issue = ?, pages = ?, doi = ?, url = ?,
                 abstract = ?, publisher = ?, book_title = ?, source_keys = ?,
                 source_tags = ?, source_collections = ?, pdf_path = ?,
-                arxiv_id = ?, venue = ?, synced_at = ?
+                arxiv_id = ?, venue = ?, synced_at = ?, content_hash = ?
             WHERE citation_key = ?
             """,
             (
@@ -232,9 +516,12 @@ class PaperRepository:
                 paper.arxiv_id,
                 paper.venue,
                 paper.synced_at,
+                paper.content_hash,
                 paper.citation_key,
             ),
         )
+        self._write_source_keys(paper)
+        self._write_relations([paper])
         return paper
 
     def upsert(self, paper: Paper) -> Paper:
@@ -247,6 +534,10 @@ class PaperRepository:
     def delete(self, citation_key: str) -> bool:
         conn = self._db.connection()
         cursor = conn.execute("DELETE FROM papers WHERE citation_key = ?", (citation_key,))
+        conn.execute("DELETE FROM paper_source_keys WHERE citation_key = ?", (citation_key,))
+        conn.execute("DELETE FROM paper_files WHERE citation_key = ?", (citation_key,))
+        for table in RELATION_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE citation_key = ?", (citation_key,))
         return cursor.rowcount > 0
 
     def soft_delete(self, citation_key: str) -> bool:
@@ -257,17 +548,67 @@ class PaperRepository:
         )
         return cursor.rowcount > 0
 
+    def restore(self, citation_key: str) -> bool:
+        conn = self._db.connection()
+        cursor = conn.execute(
+            "UPDATE papers SET deleted_at = NULL WHERE citation_key = ? AND deleted_at IS NOT NULL",
+            (citation_key,),
+        )
+        return cursor.rowcount > 0
+
+    def soft_delete_many(self, citation_keys: set[str]) -> int:
+        conn = self._db.connection()
+        now = self._now()
+        cursor = conn.executemany(
+            "UPDATE papers SET deleted_at = ? WHERE citation_key = ? AND deleted_at IS NULL",
+            [(now, key) for key in citation_keys],
+        )
+        return max(cursor.rowcount, 0)
+
     def update_citation_key(self, old_key: str, new_key: str, new_pdf_path: str | None = None):
+        self.update_citation_keys([(old_key, new_key, new_pdf_path)])
+
+    def update_citation_keys(self, renames: list[tuple[str, str, str | None]]):
         conn = self._db.connection()
-        conn.execute(
-            "UPDATE papers SET citation_key = ? WHERE citation_key = ?",
-            (new_key, old_key),
+        pairs = [(new_key, old_key) for old_key, new_key, _ in renames]
+        conn.executemany("UPDATE papers SET citation_key = ? WHERE citation_key = ?", pairs)
+        conn.executemany("UPDATE paper_source_keys SET citation_key = ? WHERE citation_key = ?", pairs)
+        conn.executemany("UPDATE paper_files SET citation_key = ? WHERE citation_key = ?", pairs)
+        for table in RELATION_TABLES:
+            conn.executemany(f"UPDATE {table} SET citation_key = ? WHERE citation_key = ?", pairs)
+        conn.executemany(
+            "UPDATE papers SET pdf_path = ? WHERE citation_key = ?",
+            [(new_pdf_path, new_key) for _, new_key, new_pdf_path in renames if new_pdf_path],
+        )
+
+    def set_pdf_paths(self, pdf_paths: list[tuple[str, str | None]]):
+        conn = self._db.connection()
+        conn.executemany(
+            "UPDATE papers SET pdf_path = ? WHERE citation_key = ?",
+            [(pdf_path, citation_key) for citation_key, pdf_path in pdf_paths],
+        )
+
+    def get_file_manifest(self) -> dict[str, tuple[str, int, int, str]]:
+        conn = self._db.connection()
+        cursor = conn.execute(
+            "SELECT citation_key, source_path, size, mtime_ns, content_hash FROM paper_files"
+        )
+        return {row[0]: tuple(row[1:]) for row in cursor}
+
+    def set_file_manifest(self, entries: list[tuple[str, str, int, int, str]]):
+        conn = self._db.connection()
+        conn.executemany(
+            """INSERT OR REPLACE INTO paper_files
+               (citation_key, source_path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?, ?)""",
+            entries,
+        )
+
+    def delete_file_manifest(self, citation_keys: list[str]):
+        conn = self._db.connection()
+        conn.executemany(
+            "DELETE FROM paper_files WHERE citation_key = ?",
+            [(key,) for key in citation_keys],
         )
-        if new_pdf_path:
-            conn.execute(
-                "UPDATE papers SET pdf_path = ? WHERE citation_key = ?",
-                (new_pdf_path, new_key),
-            )
 
     def add_source_key(self, citation_key: str, source_key: str):
         paper = self.get(citation_key)
@@ -278,26 +619,49 @@ class PaperRepository:
                 "UPDATE papers SET source_keys = ? WHERE citation_key = ?",
                 (paper.source_keys_json(), citation_key),
             )
+            conn.execute(
+                "INSERT OR REPLACE INTO paper_source_keys (source_key, citation_key) VALUES (?, ?)",
+                (source_key, citation_key),
+            )
 
     def list_source_keys(self) -> set[str]:
         conn = self._db.connection()
         cursor = conn.execute(
-            "SELECT j.value FROM papers p, json_each(p.source_keys) j WHERE p.deleted_at IS NULL"
+            """SELECT sk.source_key FROM paper_source_keys sk
+               JOIN papers p ON p.citation_key = sk.citation_key
+               WHERE p.deleted_at IS NULL"""
         )
         return {row[0] for row in cursor}
 
-    def list_all_keys(self) -> set[str]:
+    def list_all_keys(self, include_deleted: bool = False) -> set[str]:
+        conn = self._db.connection()
+        if include_deleted:
+            cursor = conn.execute("SELECT citation_key FROM papers")
+        else:
+            cursor = conn.execute(
+                "SELECT citation_key FROM papers WHERE deleted_at IS NULL"
+            )
+        return {row[0] for row in cursor}
+
+    def list_key_assignments(self) -> dict[str, tuple[str, bool]]:
         conn = self._db.connection()
         cursor = conn.execute(
-            "SELECT citation_key FROM papers WHERE deleted_at IS NULL"
+            """SELECT sk.source_key, sk.citation_key, json_extract(p.source_keys, '$[0]') = sk.source_key
+               FROM paper_source_keys sk JOIN papers p ON p.citation_key = sk.citation_key
+               WHERE p.deleted_at IS NULL"""
         )
-        return {row[0] for row in cursor}
+        return {row[0]: (row[1], bool(row[2])) for row in cursor}
+
+    def list_pdf_paths(self) -> list[tuple[str, str | None, bool]]:
+        conn = self._db.connection()
+        cursor = conn.execute("SELECT citation_key, pdf_path, deleted_at IS NOT NULL FROM papers")
+        return [(row[0], row[1], bool(row[2])) for row in cursor]
 
     def list_by_collection(self, collection: str) -> list[Paper]:
         conn = self._db.connection()
         cursor = conn.execute(
             """SELECT * FROM papers
-               WHERE EXISTS (SELECT 1 FROM json_each(source_collections) j WHERE j.value = ?)
+               WHERE citation_key IN (SELECT citation_key FROM paper_collections WHERE collection = ?)
                AND deleted_at IS NULL
                ORDER BY year DESC, citation_key""",
             (collection,),
@@ -306,55 +670,125 @@ class PaperRepository:
 
     def list_collections(self) -> list[str]:
         conn = self._db.connection()
-        cursor = conn.execute(
-            "SELECT source_collections FROM papers WHERE source_collections IS NOT NULL AND deleted_at IS NULL"
-        )
-        all_collections: set[str] = set()
-        for row in cursor:
-            all_collections.update(Paper.parse_json_list(row["source_collections"]))
-        return sorted(all_collections)
+        cursor = conn.execute("SELECT value FROM paper_facets WHERE facet = 'collection' ORDER BY value")
+        return [row[0] for row in cursor]
 
     def list_tags(self) -> list[str]:
         conn = self._db.connection()
-        cursor = conn.execute(
-            "SELECT source_tags FROM papers WHERE source_tags IS NOT NULL AND deleted_at IS NULL"
-        )
-        all_tags: set[str] = set()
-        for row in cursor:
-            all_tags.update(Paper.parse_json_list(row["source_tags"]))
-        return sorted(all_tags)
+        cursor = conn.execute("SELECT value FROM paper_facets WHERE facet = 'tag' ORDER BY value")
+        return [row[0] for row in cursor]
 
-    def get_stats(self) -> dict:
+    def get_stats(self, source: str = "zotero") -> dict:
         conn = self._db.connection()
-        total = conn.execute("SELECT COUNT(*) FROM papers WHERE deleted_at IS NULL").fetchone()[0]
-        year_range = conn.execute(
-            "SELECT MIN(year), MAX(year) FROM papers WHERE deleted_at IS NULL"
-        ).fetchone()
-        by_year = conn.execute(
-            "SELECT year, COUNT(*) as cnt FROM papers WHERE year IS NOT NULL AND deleted_at IS NULL GROUP BY year ORDER BY year DESC"
+        rows = conn.execute(
+            "SELECT facet, value, papers FROM paper_facets WHERE facet IN ('year', 'pdf') ORDER BY value DESC"
         ).fetchall()
-        pdf_count = conn.execute(
-            "SELECT COUNT(*) FROM papers WHERE pdf_path IS NOT NULL AND deleted_at IS NULL"
-        ).fetchone()[0]
+        by_year = [(row[1], row[2]) for row in rows if row[0] == "year"]
+        pdf = {row[1]: row[2] for row in rows if row[0] == "pdf"}
+        total = sum(pdf.values())
+        pdf_count = pdf.get(1, 0)
         last_sync = conn.execute(
-            "SELECT MAX(synced_at) FROM papers WHERE deleted_at IS NULL"
+            """SELECT COALESCE(
+                   (SELECT updated_at FROM sync_state WHERE source = ?),
+                   (SELECT MAX(synced_at) FROM papers WHERE deleted_at IS NULL)
+               )""",
+            (source,),
         ).fetchone()[0]
         return {
             "total": total,
-            "year_min": year_range[0],
-            "year_max": year_range[1],
-            "by_year": [(row[0], row[1]) for row in by_year],
+            "year_min": by_year[-1][0] if by_year else None,
+            "year_max": by_year[0][0] if by_year else None,
+            "by_year": by_year,
             "pdf_count": pdf_count,
             "no_pdf_count": total - pdf_count,
             "last_sync": last_sync,
         }
 
+    def get_sync_watermark(self, source: str) -> str | None:
+        conn = self._db.connection()
+        row = conn.execute("SELECT watermark FROM sync_state WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def set_sync_watermark(self, source: str, watermark: str | None):
+        conn = self._db.connection()
+        conn.execute(
+            """
+            INSERT INTO sync_state (source, watermark, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET watermark = excluded.watermark, updated_at = excluded.updated_at
+            """,
+            (source, watermark, self._now()),
+        )
+
+    def get_marker(self, name: str) -> str | None:
+        conn = self._db.connection()
+        row = conn.execute("SELECT value FROM store_markers WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_marker(self, name: str, value: str | None):
+        conn = self._db.connection()
+        conn.execute(
+            "INSERT INTO store_markers (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, value),
+        )
+
+    @contextmanager
+    def bulk_load(self):
+        conn = self._db.connection()
+        conn.commit()
+        deferred = conn.execute(
+            """SELECT type, name, sql FROM sqlite_master
+               WHERE type IN ('index', 'trigger') AND sql IS NOT NULL
+               AND tbl_name IN ('papers', 'paper_source_keys', 'paper_authors', 'paper_tags', 'paper_collections')"""
+        ).fetchall()
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+        cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(f"PRAGMA cache_size = {BULK_CACHE_SIZE}")
+        try:
+            conn.execute("BEGIN")
+            for kind, name, _ in deferred:
+                conn.execute(f"DROP {kind.upper()} {name}")
+            yield
+            for _, _, sql in deferred:
+                conn.execute(sql)
+            conn.execute("INSERT INTO papers_fts(papers_fts) VALUES('rebuild')")
+            self._rebuild_facets()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(f"PRAGMA synchronous = {synchronous}")
+            conn.execute(f"PRAGMA cache_size = {cache_size}")
+
+    def _rebuild_facets(self):
+        conn = self._db.connection()
+        counts = self._facet_counts("papers p", ["p.deleted_at IS NULL"], [])
+        conn.execute("DELETE FROM paper_facets")
+        conn.executemany(
+            "INSERT INTO paper_facets (facet, value, papers) VALUES (?, ?, ?)",
+            [(facet, value, count) for (facet, value), count in counts.items()],
+        )
+
     def rebuild_fts(self):
         conn = self._db.connection()
         conn.execute("INSERT INTO papers_fts(papers_fts) VALUES('rebuild')")
+        conn.execute("INSERT INTO papers_fts(papers_fts) VALUES('optimize')")
         conn.commit()
 
+    def check_fts(self) -> bool:
+        conn = self._db.connection()
+        try:
+            conn.execute("INSERT INTO papers_fts(papers_fts, rank) VALUES('integrity-check', 1)")
+        except sqlite3.DatabaseError:
+            return False
+        return True
+
     def delete_all(self) -> int:
         conn = self._db.connection()
         cursor = conn.execute("DELETE FROM papers")
+        conn.execute("DELETE FROM paper_source_keys")
+        conn.execute("DELETE FROM paper_files")
+        for table in RELATION_TABLES:
+            conn.execute(f"DELETE FROM {table}")
         return cursor.rowcount
@@ -1,4 +1,6 @@
-from .zotero import ZoteroSync
+from .zotero import ZoteroSync, SyncReport
 from .watcher import ZoteroWatcher
+from .worker import SyncWorker
+from .rekey import KeyRenamer
 
-__all__ = ["ZoteroSync", "ZoteroWatcher"]
+__all__ = ["ZoteroSync", "SyncReport", "ZoteroWatcher", "SyncWorker", "KeyRenamer"]
@@ -0,0 +1,89 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from ..store import PaperFiles
+from ..store.files import file_hash
+
+
+class PdfCopier:
+    def __init__(
+        self,
+        files: PaperFiles,
+        workers: int = 4,
+        manifest: dict[str, tuple[str, int, int, str]] | None = None,
+    ):
+        self._files = files
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pdf-copy")
+        self._manifest = manifest if manifest is not None else {}
+        self._pending: list[Future] = []
+        self._started: float | None = None
+        self.copied = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def _is_current(self, source_path: Path, citation_key: str) -> bool:
+        entry = self._manifest.get(citation_key)
+        if not entry or entry[0] != str(source_path) or not self._files.exists(citation_key):
+            return False
+        stat = source_path.stat()
+        return (stat.st_size, stat.st_mtime_ns) == entry[1:3]
+
+    def _dest_digest(self, dest_path: Path, dest_stat, known: tuple | None) -> str:
+        if known and known[3] and known[1:3] == (dest_stat.st_size, dest_stat.st_mtime_ns):
+            return known[3]
+        return file_hash(dest_path)
+
+    def _copy(self, source_path: Path, citation_key: str) -> tuple[str, str, tuple, bool]:
+        stat = source_path.stat()
+        dest_path = self._files.get_path(citation_key)
+        entry = (str(source_path), stat.st_size, stat.st_mtime_ns)
+        try:
+            dest_stat = dest_path.stat()
+        except FileNotFoundError:
+            dest_stat = None
+        if dest_stat and dest_stat.st_size == stat.st_size:
+            if os.path.samestat(stat, dest_stat):
+                return citation_key, self._files.relative_path(citation_key), (*entry, ""), False
+            if dest_stat.st_nlink == 1 and not dest_path.is_symlink():
+                digest = file_hash(source_path)
+                if digest == self._dest_digest(dest_path, dest_stat, self._manifest.get(citation_key)):
+                    os.utime(dest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                    return citation_key, self._files.relative_path(citation_key), (*entry, digest), False
+        return citation_key, self._files.store(source_path, citation_key), (*entry, ""), True
+
+    def submit(self, source_path: Path | str, citation_key: str) -> bool:
+        source_path = Path(source_path)
+        if self._is_current(source_path, citation_key):
+            return False
+        if self._started is None:
+            self._started = time.perf_counter()
+        self._pending.append(self._executor.submit(self._copy, source_path, citation_key))
+        return True
+
+    def drain(self) -> list[tuple[str, str, tuple]]:
+        pending, self._pending = self._pending, []
+        stored = []
+        for future in pending:
+            citation_key, pdf_path, entry, copied = future.result()
+            stored.append((citation_key, pdf_path, entry))
+            self._manifest[citation_key] = entry
+            if copied:
+                self.copied += 1
+                self.bytes += entry[1]
+        if self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self._started = None
+        return stored
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending = []
+
+    def __enter__(self) -> "PdfCopier":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
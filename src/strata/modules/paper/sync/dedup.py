@@ -0,0 +1,80 @@
+import json
+
+from ..entities import Paper
+from ..utils import normalize_doi, normalize_arxiv_id, normalize_title
+
+
+def _first_author_last(authors_json: str | None) -> str | None:
+    if not authors_json:
+        return None
+    for author in json.loads(authors_json):
+        if author.get("role", "author") == "author":
+            return author.get("last_name")
+    return None
+
+
+class DuplicateIndex:
+    def __init__(self):
+        self._by_doi: dict[str, str] = {}
+        self._by_arxiv: dict[str, str] = {}
+        self._by_title: dict[tuple[str, str, int], str] = {}
+        self._entries: dict[str, tuple] = {}
+        self._deleted: set[str] = set()
+
+    @classmethod
+    def build(cls, rows) -> "DuplicateIndex":
+        index = cls()
+        for citation_key, doi, arxiv_id, title, authors, year, deleted in rows:
+            index.add(citation_key, doi, arxiv_id, title, _first_author_last(authors), year)
+            if deleted:
+                index._deleted.add(citation_key)
+        return index
+
+    @staticmethod
+    def _keys(doi, arxiv_id, title, author_last, year) -> tuple:
+        title_key = None
+        normalized_title = normalize_title(title)
+        normalized_author = normalize_title(author_last)
+        if normalized_title and normalized_author and year:
+            title_key = (normalized_title, normalized_author, year)
+        return normalize_doi(doi), normalize_arxiv_id(arxiv_id), title_key
+
+    def add(self, citation_key: str, doi, arxiv_id, title, author_last, year):
+        self.remove(citation_key)
+        entry = self._keys(doi, arxiv_id, title, author_last, year)
+        for index, key in zip((self._by_doi, self._by_arxiv, self._by_title), entry):
+            if key is not None:
+                index[key] = citation_key
+        self._entries[citation_key] = entry
+
+    def add_paper(self, paper: Paper):
+        author = paper.first_author
+        self.add(
+            paper.citation_key, paper.doi, paper.arxiv_id, paper.title,
+            author.last_name if author else None, paper.year,
+        )
+
+    def remove(self, citation_key: str):
+        entry = self._entries.pop(citation_key, None)
+        self._deleted.discard(citation_key)
+        if not entry:
+            return
+        for index, key in zip((self._by_doi, self._by_arxiv, self._by_title), entry):
+            if key is not None and index.get(key) == citation_key:
+                del index[key]
+
+    def find(self, paper: Paper) -> str | None:
+        author = paper.first_author
+        entry = self._keys(
+            paper.doi, paper.arxiv_id, paper.title, author.last_name if author else None, paper.year
+        )
+        for index, key in zip((self._by_doi, self._by_arxiv, self._by_title), entry):
+            if key is not None and key in index:
+                return index[key]
+        return None
+
+    def is_deleted(self, citation_key: str) -> bool:
+        return citation_key in self._deleted
+
+    def restore(self, citation_key: str):
+        self._deleted.discard(citation_key)
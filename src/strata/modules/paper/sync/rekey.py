@@ -0,0 +1,101 @@
+import json
+import os
+import uuid
+
+from ..store import PaperRepository, PaperFiles
+
+REKEY_STATE = "rekey"
+STAGING_SUFFIX = ".rekey"
+JOURNAL_SUFFIX = ".rekey.json"
+
+
+class KeyRenamer:
+    def __init__(self, repo: PaperRepository, files: PaperFiles):
+        self._repo = repo
+        self._files = files
+        self._journal_path = files.files_dir.with_name(files.files_dir.name + JOURNAL_SUFFIX)
+
+    def _write_journal(self, journal: dict):
+        tmp_path = self._journal_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(journal, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._journal_path)
+
+    def _read_journal(self) -> dict | None:
+        try:
+            with open(self._journal_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _stage(self, journal: dict):
+        for old_key, _, _ in journal["renames"]:
+            self._files.rename(old_key, old_key + STAGING_SUFFIX)
+
+    def _unstage(self, journal: dict):
+        for old_key, _, _ in journal["renames"]:
+            self._files.rename(old_key + STAGING_SUFFIX, old_key)
+
+    def _commit(self, journal: dict):
+        renames = journal["renames"]
+        try:
+            self._repo.update_citation_keys([(old_key, old_key + STAGING_SUFFIX, None) for old_key, _, _ in renames])
+            self._repo.update_citation_keys(
+                [
+                    (old_key + STAGING_SUFFIX, new_key, self._files.relative_path(new_key) if has_pdf else None)
+                    for old_key, new_key, has_pdf in renames
+                ]
+            )
+            self._repo.set_marker(REKEY_STATE, journal["id"])
+            self._repo.commit()
+        except Exception:
+            self._repo.rollback()
+            raise
+
+    def _finish(self, journal: dict):
+        for old_key, new_key, _ in journal["renames"]:
+            self._files.rename(old_key + STAGING_SUFFIX, new_key)
+        os.unlink(self._journal_path)
+
+    def plan(self, renames: dict[str, str]) -> list[tuple[str, str, bool]]:
+        renames = {old_key: new_key for old_key, new_key in renames.items() if old_key != new_key}
+        targets = set(renames.values())
+        if len(targets) != len(renames):
+            raise ValueError("Rekey maps several papers to the same citation key")
+        occupied = self._repo.list_all_keys(include_deleted=True) - renames.keys()
+        if collisions := occupied & targets:
+            raise ValueError(f"Rekey targets citation keys already in use: {', '.join(sorted(collisions))}")
+        return [(old_key, new_key, self._files.exists(old_key)) for old_key, new_key in renames.items()]
+
+    def apply(self, renames: dict[str, str]) -> int:
+        self.recover()
+        journal = {"id": uuid.uuid4().hex, "phase": "stage", "renames": self.plan(renames)}
+        if not journal["renames"]:
+            return 0
+        self._write_journal(journal)
+        try:
+            self._stage(journal)
+            journal["phase"] = "commit"
+            self._write_journal(journal)
+            self._commit(journal)
+        except Exception:
+            self._unstage(journal)
+            os.unlink(self._journal_path)
+            raise
+        self._finish(journal)
+        return len(journal["renames"])
+
+    def recover(self) -> bool:
+        journal = self._read_journal()
+        if journal is None:
+            return False
+        if journal["phase"] == "stage":
+            self._unstage(journal)
+            os.unlink(self._journal_path)
+            return True
+        if self._repo.get_marker(REKEY_STATE) != journal["id"]:
+            self._commit(journal)
+        self._finish(journal)
+        return True
@@ -1,15 +1,20 @@
+import sqlite3
 import threading
 import time
 from pathlib import Path
 from typing import Callable
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent
 
+WATCHED_SUFFIXES = ("", "-wal", "-journal")
+
 
 class DebouncedHandler(FileSystemEventHandler):
-    def __init__(self, callback: Callable[[], None], debounce_seconds: float = 2.0):
+    def __init__(self, callback: Callable[[], None], debounce_seconds: float = 2.0, db_name: str | None = None):
         self._callback = callback
         self._debounce = debounce_seconds
+        self._names = {f"{db_name}{suffix}" for suffix in WATCHED_SUFFIXES} if db_name else None
         self._timer: threading.Timer | None = None
         self._lock = threading.Lock()
 
@@ -18,17 +23,31 @@ class DebouncedHandler(FileSystemEventHandler):
             self._timer = None
         self._callback()
 
-    def on_modified(self, event):
-        if event.is_directory:
-            return
-        if not event.src_path.endswith(".sqlite"):
-            return
+    def _matches(self, path: str) -> bool:
+        if self._names is None:
+            return path.endswith(".sqlite")
+        return Path(path).name in self._names
+
+    def _schedule(self):
         with self._lock:
             if self._timer:
                 self._timer.cancel()
             self._timer = threading.Timer(self._debounce, self._trigger)
             self._timer.start()
 
+    def on_modified(self, event):
+        if event.is_directory or not self._matches(event.src_path):
+            return
+        self._schedule()
+
+    def on_created(self, event):
+        self.on_modified(event)
+
+    def on_moved(self, event):
+        if event.is_directory or not self._matches(event.dest_path):
+            return
+        self._schedule()
+
     def cancel(self):
         with self._lock:
             if self._timer:
@@ -36,27 +55,107 @@ class DebouncedHandler(FileSystemEventHandler):
                 self._timer = None
 
 
+class ChangeProbe:
+    def __init__(self, db_path: Path, fingerprint: Callable[[sqlite3.Connection | None], tuple] | None = None):
+        self._db_path = db_path
+        self._fingerprint = fingerprint
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._data_version: int | None = None
+        self._last: tuple | None = None
+
+    def _read_live(self) -> tuple[int, tuple | None]:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                f"file:{self._db_path}?mode=ro", uri=True, timeout=0, check_same_thread=False
+            )
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self._fingerprint(conn) if self._fingerprint else None
+        finally:
+            conn.rollback()
+
+    def _read(self) -> tuple[int | None, tuple | None]:
+        try:
+            return self._read_live()
+        except sqlite3.Error:
+            pass
+        if self._fingerprint is None:
+            return None, None
+        try:
+            return None, self._fingerprint(None)
+        except sqlite3.Error:
+            return None, None
+
+    def reset(self):
+        with self._lock:
+            self._data_version, self._last = self._read()
+
+    def changed(self) -> bool:
+        with self._lock:
+            data_version, current = self._read()
+            if data_version is not None and data_version == self._data_version:
+                return False
+            if current is None:
+                self._data_version = data_version
+                return True
+            if current == self._last:
+                if data_version is not None:
+                    self._data_version = data_version
+                return False
+            self._data_version = data_version
+            self._last = current
+            return True
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+
 class ZoteroWatcher:
     def __init__(
         self,
         db_path: Path | str,
         on_change: Callable[[], None],
         debounce_seconds: float = 2.0,
+        fingerprint: Callable[[], tuple] | None = None,
+        polling: bool = False,
     ):
         self._db_path = Path(db_path).expanduser()
         self._watch_dir = self._db_path.parent
         self._on_change = on_change
         self._debounce = debounce_seconds
+        self._polling = polling
+        self._probe = ChangeProbe(self._db_path, fingerprint)
         self._observer: Observer | None = None
         self._handler: DebouncedHandler | None = None
 
+    def _check(self):
+        if self._probe.changed():
+            self._on_change()
+
+    def _start_observer(self, observer_class) -> Observer:
+        observer = observer_class()
+        observer.schedule(self._handler, str(self._watch_dir), recursive=False)
+        observer.start()
+        return observer
+
     def start(self):
         if self._observer:
             return
-        self._handler = DebouncedHandler(self._on_change, self._debounce)
-        self._observer = Observer()
-        self._observer.schedule(self._handler, str(self._watch_dir), recursive=False)
-        self._observer.start()
+        self._probe.reset()
+        self._handler = DebouncedHandler(self._check, self._debounce, self._db_path.name)
+        if not self._polling:
+            try:
+                self._observer = self._start_observer(Observer)
+                return
+            except OSError:
+                pass
+        self._observer = self._start_observer(PollingObserver)
 
     def stop(self):
         if self._handler:
@@ -66,6 +165,7 @@ class ZoteroWatcher:
             self._observer.stop()
             self._observer.join()
             self._observer = None
+        self._probe.close()
 
     def is_running(self) -> bool:
         return self._observer is not None and self._observer.is_alive()
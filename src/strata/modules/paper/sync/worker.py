@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Callable
+
+from .zotero import SyncReport, ZoteroSync
+
+
+class SyncWorker:
+    def __init__(
+        self,
+        factory: Callable[[], ZoteroSync],
+        on_complete: Callable[[SyncReport, float], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+    ):
+        self._factory = factory
+        self._on_complete = on_complete
+        self._on_error = on_error
+        self._cond = threading.Condition()
+        self._pending: bool | None = None
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self.requested = 0
+        self.coalesced = 0
+        self.completed = 0
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return int(self._pending is not None)
+
+    def request(self, full: bool = False):
+        with self._cond:
+            self.requested += 1
+            if self._pending is not None:
+                self.coalesced += 1
+                full = full or self._pending
+            self._pending = full
+            self._cond.notify()
+
+    def _next(self) -> bool | None:
+        with self._cond:
+            while self._pending is None and not self._stopping:
+                self._cond.wait()
+            if self._stopping:
+                return None
+            full, self._pending = self._pending, None
+            return full
+
+    def _run(self):
+        try:
+            syncer = self._factory()
+        except Exception as e:
+            with self._cond:
+                self._stopping = True
+                self._pending = None
+            if self._on_error:
+                self._on_error(e)
+            return
+        try:
+            while (full := self._next()) is not None:
+                start = time.perf_counter()
+                try:
+                    report = syncer.sync(full=full)
+                except Exception as e:
+                    if self._on_error:
+                        self._on_error(e)
+                    continue
+                self.completed += 1
+                if self._on_complete:
+                    self._on_complete(report, time.perf_counter() - start)
+        finally:
+            syncer.close()
+
+    def start(self):
+        if self._thread:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="paper-sync")
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self) -> "SyncWorker":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
@@ -1,11 +1,21 @@
+import os
 from datetime import datetime, timezone
+from functools import wraps
+from itertools import chain, islice
+
+from pydantic import BaseModel
 
 from ..entities import Paper, Author
 from ..models import ZoteroItem
-from ..utils import extract_arxiv_id, normalize_venue
+from ..utils import extract_arxiv_id, normalize_venue, normalize_doi, normalize_arxiv_id
 from ..sources.zotero import ZoteroReader, ZoteroStorageManager
-from ..store import PaperDatabase, PaperRepository, PaperFiles
+from ..store import PaperDatabase, PaperRepository, PaperFiles, FileReconciler, NearDuplicateIndex
 from ..export import CitationKeyManager
+from .copier import PdfCopier
+from .dedup import DuplicateIndex
+from .rekey import KeyRenamer
+
+SYNC_SOURCE = "zotero"
 
 ZOTERO_TYPE_MAP = {
     "journalArticle": "article",
@@ -19,6 +29,40 @@ ZOTERO_TYPE_MAP = {
 }
 
 
+def _exclusive(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._db.lock():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class SyncReport(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    merged: int = 0
+    renamed: int = 0
+    pdf_copied: int = 0
+    pdf_bytes: int = 0
+    pdf_seconds: float = 0.0
+
+    @property
+    def pdf_throughput(self) -> float:
+        if not self.pdf_seconds:
+            return 0.0
+        return self.pdf_bytes / self.pdf_seconds / 2**20
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+
 class ZoteroSync:
     def __init__(
         self,
@@ -27,13 +71,26 @@ class ZoteroSync:
         db: PaperDatabase,
         files: PaperFiles,
         stop_words: set[str] | None = None,
+        batch_size: int = 500,
+        atomic: bool = False,
+        pdf_workers: int = 4,
+        dedupe_threshold: float = 0.7,
+        auto_merge: bool = False,
     ):
         self._reader = reader
         self._zotero_storage = zotero_storage
+        self._db = db
         self._repo = PaperRepository(db)
         self._files = files
         self._stop_words = stop_words or set()
         self._key_manager = CitationKeyManager(self._stop_words)
+        self._batch_size = batch_size
+        self._atomic = atomic
+        self._pdf_workers = pdf_workers
+        self._near_duplicates = NearDuplicateIndex(db)
+        self._renamer = KeyRenamer(self._repo, files)
+        self._dedupe_threshold = dedupe_threshold
+        self._auto_merge = auto_merge
 
     def _now(self) -> str:
         return datetime.now(timezone.utc).isoformat()
@@ -43,7 +100,7 @@ class ZoteroSync:
             Author(first_name=c.first_name, last_name=c.last_name, role=c.role)
             for c in item.creators
         ]
-        return Paper(
+        paper = Paper(
             citation_key=citation_key,
             item_type=ZOTERO_TYPE_MAP.get(item.item_type, "misc"),
             title=item.title,
@@ -65,126 +122,324 @@ class ZoteroSync:
             venue=normalize_venue(item.journal, item.book_title),
             synced_at=self._now(),
         )
+        paper.content_hash = paper.content_fingerprint()
+        return paper
 
-    def _sync_pdf(self, item: ZoteroItem, citation_key: str) -> str | None:
+    def _queue_pdf(self, item: ZoteroItem, citation_key: str, copier: PdfCopier) -> bool:
         pdf_path = self._zotero_storage.get_pdf_path(item)
         if not pdf_path:
-            return None
-        return self._files.store(pdf_path, citation_key)
-
-    def _find_duplicate(self, paper: Paper) -> Paper | None:
-        if paper.doi:
-            existing = self._repo.find_by_doi(paper.doi)
-            if existing:
-                return existing
-        if paper.arxiv_id:
-            existing = self._repo.find_by_arxiv_id(paper.arxiv_id)
-            if existing:
-                return existing
-        if paper.title and paper.first_author and paper.year:
-            existing = self._repo.find_by_title_author_year(
-                paper.title, paper.first_author.last_name, paper.year
-            )
-            if existing:
-                return existing
-        return None
+            return False
+        copier.submit(pdf_path, citation_key)
+        return True
 
-    def _cascade_key(self, old_key: str, new_key: str):
-        new_pdf = self._files.rename(old_key, new_key)
-        self._repo.update_citation_key(old_key, new_key, new_pdf)
+    def _queue_changed_pdfs(self, manifest: dict[str, tuple[str, int, int, str]], copier: PdfCopier):
+        live = {citation_key for citation_key, pdf_path, deleted in self._repo.list_pdf_paths() if pdf_path and not deleted}
+        for citation_key, (source_path, *_) in list(manifest.items()):
+            if citation_key in live and os.path.exists(source_path):
+                copier.submit(source_path, citation_key)
 
-    def sync(self) -> tuple[list[Paper], int]:
-        items = sorted(self._reader.list_items(), key=lambda i: i.key)
-        zotero_keys = {item.key for item in items}
+    def _apply_copies(self, copier: PdfCopier):
+        stored = copier.drain()
+        self._repo.set_pdf_paths([(citation_key, pdf_path) for citation_key, pdf_path, _ in stored])
+        self._repo.set_file_manifest([(citation_key, *entry) for citation_key, _, entry in stored])
 
+    def _find_duplicate(self, paper: Paper, dedup: DuplicateIndex) -> tuple[Paper | None, bool]:
+        citation_key = dedup.find(paper)
+        if not citation_key:
+            return None, False
+        restored = dedup.is_deleted(citation_key)
+        if restored:
+            self._repo.restore(citation_key)
+            dedup.restore(citation_key)
+        return self._repo.get(citation_key), restored
+
+    def _delete_orphans(self, zotero_keys: set[str]) -> int:
         existing_source_keys = self._repo.list_source_keys()
         orphan_keys = existing_source_keys - zotero_keys
-        deleted_count = 0
+        to_delete: set[str] = set()
         for source_key in orphan_keys:
             paper = self._repo.get_by_source_key(source_key)
             if not paper:
                 continue
             remaining = [k for k in paper.source_keys if k in zotero_keys]
             if not remaining:
-                self._repo.soft_delete(paper.citation_key)
-                self._repo.commit()
-                deleted_count += 1
-
-        key_map = self._key_manager.generate_all(items)
-        all_keys = self._repo.list_all_keys()
-
-        results = []
-        for item in items:
-            existing = self._repo.get_by_source_key(item.key)
-            target_key = key_map[item.key]
-            paper = self._convert_item(item, target_key)
-
-            if not existing:
-                duplicate = self._find_duplicate(paper)
-                if duplicate:
-                    self._repo.add_source_key(duplicate.citation_key, item.key)
-                    existing = duplicate
-
-            if existing:
-                if target_key != existing.citation_key and target_key not in all_keys:
-                    self._cascade_key(existing.citation_key, target_key)
-                    all_keys.discard(existing.citation_key)
-                    all_keys.add(target_key)
-                elif target_key != existing.citation_key:
-                    target_key = existing.citation_key
+                to_delete.add(paper.citation_key)
+        return self._repo.soft_delete_many(to_delete)
+
+    def _is_unchanged(self, paper: Paper, existing: Paper) -> bool:
+        return (
+            paper.content_hash == existing.content_hash
+            and paper.citation_key == existing.citation_key
+            and paper.pdf_path == existing.pdf_path
+            and set(paper.source_keys) == set(existing.source_keys)
+        )
+
+    def _key_is_stale(self, item: ZoteroItem, existing: Paper) -> bool:
+        return existing.source_keys[:1] == [item.key] and not self._key_manager.matches(item, existing.citation_key)
+
+    def _plan_keys(self, stale: list[tuple[ZoteroItem, str]]) -> dict[str, str]:
+        reserved = self._repo.list_all_keys(include_deleted=True) - {citation_key for _, citation_key in stale}
+        plan = self._key_manager.generate_all([item for item, _ in stale], reserved)
+        return {citation_key: plan[item.key] for item, citation_key in stale if plan[item.key] != citation_key}
+
+    def _sync_item(
+        self,
+        item: ZoteroItem,
+        target_key: str,
+        existing: Paper | None,
+        all_keys: set[str],
+        zotero_keys: set[str],
+        copier: PdfCopier,
+        dedup: DuplicateIndex,
+    ) -> str:
+        paper = self._convert_item(item, target_key)
+
+        duplicate = None
+        restored = False
+        if not existing:
+            duplicate, restored = self._find_duplicate(paper, dedup)
+            if duplicate:
+                self._repo.add_source_key(duplicate.citation_key, item.key)
+                existing = duplicate
+                target_key = duplicate.citation_key
+
+        if existing and existing.source_keys[:1] != [item.key] and existing.source_keys[0] in zotero_keys:
+            if not existing.pdf_path:
+                self._queue_pdf(item, existing.citation_key, copier)
+            if restored:
+                return "inserted"
+            return "updated" if duplicate else "unchanged"
+
+        if existing:
+            target_key = existing.citation_key
+            paper.citation_key = target_key
+            paper.imported_at = existing.imported_at
+            paper.source_keys = existing.source_keys + [k for k in [item.key] if k not in existing.source_keys]
+            if self._queue_pdf(item, target_key, copier) or self._files.exists(target_key):
+                paper.pdf_path = existing.pdf_path
+            if self._is_unchanged(paper, existing):
+                return "inserted" if restored else "unchanged"
+            self._repo.upsert(paper)
+            dedup.remove(existing.citation_key)
+            dedup.add_paper(paper)
+            return "inserted" if restored else "updated"
+        else:
+            if target_key in all_keys:
+                target_key = self._key_manager.generate_unique(item, all_keys)
                 paper.citation_key = target_key
-                paper.imported_at = existing.imported_at
-                paper.source_keys = list(set(existing.source_keys + [item.key]))
-                if not self._files.exists(target_key):
-                    paper.pdf_path = self._sync_pdf(item, target_key)
-                else:
-                    paper.pdf_path = existing.pdf_path
-            else:
-                paper.imported_at = self._now()
-                paper.pdf_path = self._sync_pdf(item, target_key)
-                all_keys.add(target_key)
+            paper.imported_at = self._now()
+            self._queue_pdf(item, target_key, copier)
+            all_keys.add(target_key)
+
+        self._repo.upsert(paper)
+        dedup.add_paper(paper)
+        return "inserted"
+
+    def _recover(self):
+        self._db.recover(self._files.sealed_shadow())
+        self._files.recover()
+        self._renamer.recover()
 
-            results.append(self._repo.upsert(paper))
-            self._repo.commit()
+    @_exclusive
+    def sync(self, full: bool = False) -> SyncReport:
+        self._recover()
+        manifest = self._repo.get_file_manifest()
+        with self._reader.session(), PdfCopier(self._files, self._pdf_workers, manifest) as copier:
+            watermark = None if full else self._repo.get_sync_watermark(SYNC_SOURCE)
+            next_watermark = self._reader.current_watermark()
 
-        self._repo.rebuild_fts()
+            try:
+                zotero_keys = self._reader.list_keys()
+                report = SyncReport(deleted=self._delete_orphans(zotero_keys))
+                all_keys = self._repo.list_all_keys(include_deleted=True)
+                dedup = DuplicateIndex.build(self._repo.list_identities())
+
+                stale: list[tuple[ZoteroItem, str]] = []
+
+                for item in self._reader.iter_items(self._batch_size, modified_since=watermark):
+                    existing = self._repo.get_by_source_key(item.key)
+                    if existing and self._key_is_stale(item, existing):
+                        stale.append((item, existing.citation_key))
+                    target_key = existing.citation_key if existing else self._key_manager.generate_unique(item, all_keys)
+                    status = self._sync_item(item, target_key, existing, all_keys, zotero_keys, copier, dedup)
+                    setattr(report, status, getattr(report, status) + 1)
+                    if report.total % self._batch_size == 0:
+                        self._apply_copies(copier)
+                        if not self._atomic:
+                            self._repo.commit()
+
+                self._apply_copies(copier)
+                if watermark is not None:
+                    self._queue_changed_pdfs(manifest, copier)
+                    self._apply_copies(copier)
+                report.pdf_copied, report.pdf_bytes, report.pdf_seconds = copier.copied, copier.bytes, copier.seconds
+                self._repo.set_sync_watermark(SYNC_SOURCE, next_watermark)
+                self._repo.commit()
+            except Exception:
+                self._repo.rollback()
+                raise
+
+        report.renamed = self._renamer.apply(self._plan_keys(stale))
+        refreshed = self._near_duplicates.refresh()
+        if self._auto_merge and refreshed:
+            report.merged = self.merge_duplicates(
+                self._near_duplicates.find_pairs(self._dedupe_threshold, refreshed)
+            )
+        self._repo.commit()
         self._cleanup()
 
-        return results, deleted_count
+        return report
+
+    def _merge_rank(self, paper: Paper) -> tuple:
+        return (paper.doi is None, paper.pdf_path is None, paper.imported_at or "", paper.citation_key)
+
+    def _conflicting(self, left: Paper, right: Paper) -> bool:
+        if left.doi and right.doi and normalize_doi(left.doi) != normalize_doi(right.doi):
+            return True
+        if left.arxiv_id and right.arxiv_id and normalize_arxiv_id(left.arxiv_id) != normalize_arxiv_id(right.arxiv_id):
+            return True
+        return bool(left.year and right.year and abs(left.year - right.year) > 1)
+
+    @_exclusive
+    def merge_duplicates(self, pairs: list[tuple[str, str, float]]) -> int:
+        survivors: dict[str, str] = {}
+        count = 0
+        for left, right, _ in pairs:
+            while left in survivors:
+                left = survivors[left]
+            while right in survivors:
+                right = survivors[right]
+            if left == right:
+                continue
+            papers = [self._repo.get(left), self._repo.get(right)]
+            if None in papers or self._conflicting(*papers):
+                continue
+            keep, drop = sorted(papers, key=self._merge_rank)
+            for source_key in drop.source_keys:
+                self._repo.add_source_key(keep.citation_key, source_key)
+            if not keep.pdf_path and drop.pdf_path and not self._files.exists(keep.citation_key):
+                self._files.delete(keep.citation_key)
+                self._repo.set_pdf_paths([(keep.citation_key, self._files.rename(drop.citation_key, keep.citation_key))])
+            else:
+                self._files.delete(drop.citation_key)
+            self._repo.delete(drop.citation_key)
+            survivors[drop.citation_key] = keep.citation_key
+            count += 1
+        if count:
+            self._near_duplicates.refresh()
+        return count
+
+    @_exclusive
+    def rekey(self) -> dict[str, str]:
+        self._recover()
+        assignments = self._repo.list_key_assignments()
+        owners = {source_key: key for source_key, (key, owner) in assignments.items() if owner}
+        with self._reader.session():
+            stale = [(item, owners[item.key]) for item in self._reader.iter_items(self._batch_size) if item.key in owners]
+        renames = self._plan_keys(stale)
+        self._renamer.apply(renames)
+        self._near_duplicates.refresh()
+        self._repo.commit()
+        return renames
 
     def _cleanup(self):
-        db_keys = self._repo.list_all_keys()
+        FileReconciler(self._repo, self._files).reconcile()
+
+    def _rebuild(
+        self, manifest: dict[str, tuple[str, int, int, str]], assignments: dict[str, tuple[str, bool]]
+    ) -> int:
+        with (
+            self._reader.session(),
+            PdfCopier(self._files, self._pdf_workers, manifest) as copier,
+            self._repo.bulk_load(),
+        ):
+            next_watermark = self._reader.current_watermark()
+            taken = {citation_key for citation_key, _ in assignments.values()}
+            generated: set[str] = set()
+            with_pdf: set[str] = set()
+            dedup = DuplicateIndex()
+            count = 0
+            absorbed: list[ZoteroItem] = []
+            items = self._reader.iter_items(self._batch_size)
+            batches = iter(lambda: list(islice(items, self._batch_size)), [])
+            for batch in chain(batches, [absorbed]):
+                papers: dict[str, Paper] = {}
+                for item in batch:
+                    citation_key, owner = assignments.get(item.key, (None, False))
+                    if citation_key and not owner and batch is not absorbed:
+                        absorbed.append(item)
+                        continue
+                    if citation_key in generated and not owner:
+                        duplicate = citation_key
+                    else:
+                        if (
+                            not citation_key
+                            or citation_key in generated
+                            or (owner and not self._key_manager.matches(item, citation_key))
+                        ):
+                            citation_key = self._key_manager.generate_unique(item, taken)
+                        paper = self._convert_item(item, citation_key)
+                        duplicate = dedup.find(paper)
+                    if duplicate:
+                        if duplicate in papers:
+                            papers[duplicate].source_keys.append(item.key)
+                        else:
+                            self._repo.add_source_key(duplicate, item.key)
+                        if duplicate not in with_pdf and self._queue_pdf(item, duplicate, copier):
+                            with_pdf.add(duplicate)
+                            if duplicate in papers:
+                                papers[duplicate].pdf_path = self._files.relative_path(duplicate)
+                            else:
+                                self._repo.set_pdf_paths([(duplicate, self._files.relative_path(duplicate))])
+                        continue
+                    generated.add(citation_key)
+                    taken.add(citation_key)
+                    paper.imported_at = self._now()
+                    if self._queue_pdf(item, citation_key, copier):
+                        paper.pdf_path = self._files.relative_path(citation_key)
+                        with_pdf.add(citation_key)
+                    papers[citation_key] = paper
+                    dedup.add_paper(paper)
+                self._repo.insert_many(list(papers.values()))
+                self._apply_copies(copier)
+                count += len(papers)
+            self._repo.set_file_manifest([(key, *manifest[key]) for key in with_pdf if key in manifest])
+            self._repo.set_sync_watermark(SYNC_SOURCE, next_watermark)
+
+        self._near_duplicates.refresh()
+        self._repo.commit()
         for folder in self._files.list_folders():
-            if folder not in db_keys:
+            if folder not in with_pdf:
                 self._files.delete(folder)
 
-        conn = self._repo._db.connection()
-        for paper in self._repo.list_all():
-            if paper.pdf_path and not self._files.exists(paper.citation_key):
-                conn.execute(
-                    "UPDATE papers SET pdf_path = NULL WHERE citation_key = ?",
-                    (paper.citation_key,),
-                )
-        conn.commit()
-
-    def deep_sync(self) -> list[Paper]:
-        self._repo.delete_all()
-        self._repo.commit()
-        self._files.delete_all()
-
-        items = sorted(self._reader.list_items(), key=lambda i: i.key)
-        key_map = self._key_manager.generate_all(items)
-        results = []
-        for item in items:
-            citation_key = key_map[item.key]
-            paper = self._convert_item(item, citation_key)
-            paper.imported_at = self._now()
-            paper.pdf_path = self._sync_pdf(item, citation_key)
-            results.append(self._repo.insert(paper))
-        self._repo.commit()
-        self._repo.rebuild_fts()
+        return count
+
+    @_exclusive
+    def deep_sync(self) -> int:
+        self._recover()
+        shadow_db = self._db.shadow()
+        shadow_db.initialize()
+        shadow_files = self._files.shadow()
+        try:
+            shadow = ZoteroSync(
+                self._reader, self._zotero_storage, shadow_db, shadow_files, self._stop_words,
+                self._batch_size, self._atomic, self._pdf_workers, self._dedupe_threshold, self._auto_merge,
+            )
+            count = shadow._rebuild(self._repo.get_file_manifest(), self._repo.list_key_assignments())
+            if not shadow_db.check() or not shadow._repo.check_fts():
+                raise RuntimeError(f"Shadow database failed validation: {shadow_db.path}")
+        except BaseException:
+            shadow_db.discard()
+            shadow_files.discard()
+            raise
+
+        shadow_files.seal()
+        self._db.replace_with(shadow_db)
+        self._files.replace_with(shadow_files)
+        return count
 
-        return results
+    def close(self):
+        self._db.close()
 
     def list_new_items(self) -> list[ZoteroItem]:
         items = self._reader.list_items()
@@ -1,4 +1,5 @@
 import re
+import unicodedata
 
 _ARXIV_PATTERNS = [
     re.compile(r"arxiv\.org/abs/(\d{4}\.\d{4,5}(?:v\d+)?)"),
@@ -51,3 +52,58 @@ def normalize_venue(journal: str | None, book_title: str | None) -> str | None:
             if pattern.search(source):
                 return venue
     return journal or book_title or None
+
+
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.I)
+_ARXIV_VERSION = re.compile(r"v\d+$")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_doi(doi: str | None) -> str | None:
+    if not doi:
+        return None
+    return _DOI_PREFIX.sub("", doi.strip()).lower() or None
+
+
+def normalize_arxiv_id(arxiv_id: str | None) -> str | None:
+    if not arxiv_id:
+        return None
+    return _ARXIV_VERSION.sub("", arxiv_id.strip().lower()) or None
+
+
+def normalize_title(title: str | None) -> str | None:
+    if not title:
+        return None
+    return " ".join(_NON_WORD.sub(" ", title.casefold()).split()) or None
+
+
+def fold_name(name: str | None) -> str:
+    if not name:
+        return ""
+    text = "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", text.casefold()).split())
+
+
+def edit_distance(left: str, right: str, limit: int | None = None) -> int:
+    if limit is None:
+        limit = max(len(left), len(right))
+    if abs(len(left) - len(right)) > limit:
+        return limit + 1
+    beyond = limit + 1
+    older: list[int] = []
+    previous = [j if j <= limit else beyond for j in range(len(right) + 1)]
+    for i, a in enumerate(left, 1):
+        low, high = max(1, i - limit), min(len(right), i + limit)
+        current = [beyond] * (len(right) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(low, high + 1):
+            b = right[j - 1]
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a != b), beyond)
+            if older and j > 1 and a != b and a == right[j - 2] and left[i - 2] == b:
+                cost = min(cost, older[j - 2] + 1)
+            current[j] = cost
+        if min(current[low - 1 : high + 1]) > limit:
+            return beyond
+        older, previous = previous, current
+    return previous[-1]
@@ -1,6 +1,7 @@
 from mcp.types import TextContent
 
 from strata.base.configs import ConfigService
+from strata.modules.paper.store import FileReconciler
 from strata.server.common import text, lines, not_found
 from ..helpers import get_components
 
@@ -16,17 +17,18 @@ def _short_authors(paper) -> str:
     return f"{authors[0].last_name} et al."
 
 
+def _filters(arguments: dict) -> dict:
+    return {
+        name: arguments.get(name)
+        for name in ("query", "arxiv_id", "year_from", "year_to", "author", "venue", "tag", "collection")
+    }
+
+
 def handle_find(config: ConfigService, arguments: dict) -> list[TextContent]:
     db, files, repo = get_components(config)
     try:
         papers, total = repo.find(
-            query=arguments.get("query"),
-            arxiv_id=arguments.get("arxiv_id"),
-            year_from=arguments.get("year_from"),
-            year_to=arguments.get("year_to"),
-            author=arguments.get("author"),
-            venue=arguments.get("venue"),
-            tag=arguments.get("tag"),
+            **_filters(arguments),
             sort_by=arguments.get("sort_by", "relevance"),
             limit=arguments.get("limit", 20),
             offset=arguments.get("offset", 0),
@@ -110,11 +112,15 @@ def handle_browse(config: ConfigService, arguments: dict) -> list[TextContent]:
     try:
         browse_type = arguments.get("type", "tags")
 
-        if browse_type == "tags":
-            items = repo.list_tags()
+        if browse_type in ("tags", "collections"):
+            facet = browse_type[:-1]
+            items = sorted(repo.facets()[facet])
             if not items:
-                return text("No tags.")
-            return text(f"Tags ({len(items)}):\n\n" + "\n".join(f"- {t}" for t in items))
+                return text(f"No {browse_type}.")
+            return text(
+                f"{browse_type.capitalize()} ({len(items)}):\n\n"
+                + "\n".join(f"- {value} ({count})" for value, count in items)
+            )
 
         elif browse_type == "stats":
             stats = repo.get_stats()
@@ -129,17 +135,16 @@ def handle_browse(config: ConfigService, arguments: dict) -> list[TextContent]:
             for year, count in stats["by_year"][:10]:
                 parts.append(f"  {year}: {count}")
 
-            db_keys = repo.list_all_keys()
-            folder_keys = set(files.list_folders())
-            orphan_folders = folder_keys - db_keys
-            orphan_records = {k for p in repo.list_all() if p.pdf_path for k in [p.citation_key] if not files.exists(k)}
-            if orphan_folders or orphan_records:
+            report = FileReconciler(repo, files).scan()
+            if report.has_anomalies:
                 parts.append("")
                 parts.append("Anomalies:")
-                if orphan_folders:
-                    parts.append(f"  Orphan folders (no DB record): {len(orphan_folders)}")
-                if orphan_records:
-                    parts.append(f"  Missing PDFs (DB says exists): {len(orphan_records)}")
+                if report.orphan_folders:
+                    parts.append(f"  Orphan folders (no DB record): {len(report.orphan_folders)}")
+                if report.missing_pdfs:
+                    parts.append(f"  Missing PDFs (DB says exists): {len(report.missing_pdfs)}")
+                if report.stale_paths:
+                    parts.append(f"  Stale PDF paths: {len(report.stale_paths)}")
 
             return lines(*parts)
 
@@ -149,8 +154,47 @@ def handle_browse(config: ConfigService, arguments: dict) -> list[TextContent]:
         db.close()
 
 
+def handle_authors(config: ConfigService, arguments: dict) -> list[TextContent]:
+    db, files, repo = get_components(config)
+    try:
+        prefix = arguments.get("prefix", "")
+        authors = repo.suggest_authors(prefix, limit=arguments.get("limit", 10))
+        if not authors:
+            return text(f"No authors matching '{prefix}'.")
+        return text(
+            f"Authors matching '{prefix}':\n\n"
+            + "\n".join(f"- {name} ({count} papers)" for name, count in authors)
+        )
+    finally:
+        db.close()
+
+
+def handle_facets(config: ConfigService, arguments: dict) -> list[TextContent]:
+    db, files, repo = get_components(config)
+    try:
+        facets = repo.facets(**_filters(arguments), limit=arguments.get("limit", 10))
+        if not facets["total"]:
+            return text("No papers found.")
+
+        pdf = dict(facets["pdf"])
+        parts = [
+            f"Papers: {facets['total']}",
+            f"PDFs: {pdf.get(1, 0)} available, {pdf.get(0, 0)} missing",
+        ]
+        for facet, label in (("year", "Years"), ("venue", "Venues"), ("tag", "Tags"), ("collection", "Collections")):
+            if facets[facet]:
+                parts.append("")
+                parts.append(f"{label}:")
+                parts.extend(f"  {value}: {count}" for value, count in facets[facet])
+        return lines(*parts)
+    finally:
+        db.close()
+
+
 LOCATE_HANDLERS = {
     "paper_locate_find": handle_find,
     "paper_locate_info": handle_info,
     "paper_locate_browse": handle_browse,
+    "paper_locate_authors": handle_authors,
+    "paper_locate_facets": handle_facets,
 }
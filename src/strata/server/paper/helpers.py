@@ -1,14 +1,27 @@
 from strata.base.configs import ConfigService
 from strata.modules.paper.store import PaperDatabase, PaperRepository, PaperFiles
 
+_databases: dict[str, PaperDatabase] = {}
+
+
+def _get_database(config: ConfigService, db_path: str, files_dir: str) -> PaperDatabase:
+    db = _databases.get(db_path)
+    if db is None:
+        pragmas = config.get("paper.store.sqlite", {}) or {}
+        readers = config.get("paper.store.readers", 4)
+        db = PaperDatabase(db_path, pragmas, readers)
+        db.initialize(files_dir=files_dir)
+        db.close()
+        _databases[db_path] = db
+    return db
+
 
 def get_components(config: ConfigService):
     db_path = config.get("paper.store.database", "~/workspace/resource/paper/paper.sqlite")
     files_dir = config.get("paper.store.files_dir", "~/workspace/resource/paper/files")
 
-    db = PaperDatabase(db_path)
-    db.initialize(files_dir=files_dir)
+    session = _get_database(config, db_path, files_dir).reader()
     files = PaperFiles(files_dir)
-    repo = PaperRepository(db)
+    repo = PaperRepository(session)
 
-    return db, files, repo
+    return session, files, repo
@@ -1,5 +1,44 @@
 from mcp.types import Tool
 
+FILTER_PROPERTIES = {
+    "query": {
+        "type": "string",
+        "description": "Full-text search query (matches title, author, abstract via FTS5)",
+    },
+    "arxiv_id": {
+        "type": "string",
+        "description": "Filter by arXiv ID (e.g., 2301.12345)",
+    },
+    "year_from": {
+        "type": "integer",
+        "description": "Minimum year (inclusive)",
+    },
+    "year_to": {
+        "type": "integer",
+        "description": "Maximum year (inclusive)",
+    },
+    "author": {
+        "type": "string",
+        "description": (
+            "Author name, accent- and case-insensitive. Matches surname or given-name prefixes "
+            "(e.g., 'mull', 'Müller, J') and tolerates small misspellings (e.g., 'vasvani', 'le cun'); "
+            "exact surname and first-author matches rank first"
+        ),
+    },
+    "venue": {
+        "type": "string",
+        "description": "Venue name (e.g., NeurIPS, ICML, arXiv)",
+    },
+    "tag": {
+        "type": "string",
+        "description": "Filter by tag",
+    },
+    "collection": {
+        "type": "string",
+        "description": "Filter by collection (e.g., ML/Vision)",
+    },
+}
+
 LOCATE_TOOLS = [
     Tool(
         name="paper_locate_find",
@@ -12,34 +51,7 @@ LOCATE_TOOLS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "query": {
-                    "type": "string",
-                    "description": "Full-text search query (matches title, author, abstract via FTS5)",
-                },
-                "arxiv_id": {
-                    "type": "string",
-                    "description": "Filter by arXiv ID (e.g., 2301.12345)",
-                },
-                "year_from": {
-                    "type": "integer",
-                    "description": "Minimum year (inclusive)",
-                },
-                "year_to": {
-                    "type": "integer",
-                    "description": "Maximum year (inclusive)",
-                },
-                "author": {
-                    "type": "string",
-                    "description": "Author name (partial match)",
-                },
-                "venue": {
-                    "type": "string",
-                    "description": "Venue name (e.g., NeurIPS, ICML, arXiv)",
-                },
-                "tag": {
-                    "type": "string",
-                    "description": "Filter by tag",
-                },
+                **FILTER_PROPERTIES,
                 "sort_by": {
                     "type": "string",
                     "enum": ["relevance", "year"],
@@ -86,11 +98,55 @@ LOCATE_TOOLS = [
             "properties": {
                 "type": {
                     "type": "string",
-                    "enum": ["tags", "stats"],
-                    "description": "What to browse: tags or stats (year distribution, PDF coverage, last sync)",
+                    "enum": ["tags", "collections", "stats"],
+                    "description": (
+                        "What to browse: tags or collections (with paper counts), "
+                        "or stats (year distribution, PDF coverage, last sync)"
+                    ),
                 },
             },
             "required": ["type"],
         },
     ),
+    Tool(
+        name="paper_locate_authors",
+        description=(
+            "Suggest author names matching a prefix or a slightly misspelled name, "
+            "ranked by match quality and paper count. "
+            "Use when: user gives a partial or misspelled author name, "
+            "or before filtering paper_locate_find by author."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "prefix": {
+                    "type": "string",
+                    "description": "Start of a surname or given name (e.g., 'vasw', 'Müller, J')",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Max suggestions (default: 10)",
+                },
+            },
+            "required": ["prefix"],
+        },
+    ),
+    Tool(
+        name="paper_locate_facets",
+        description=(
+            "Count papers per tag, collection, venue, year and PDF availability. "
+            "Accepts the same filters as paper_locate_find and counts only matching papers. "
+            "Use when: user asks how results are distributed, or to suggest ways to narrow a search."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                **FILTER_PROPERTIES,
+                "limit": {
+                    "type": "integer",
+                    "description": "Max values per facet, most frequent first (default: 10)",
+                },
+            },
+        },
+    ),
 ]